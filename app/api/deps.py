@@ -3,8 +3,9 @@ from jose import jwt, JWTError
 from app.core.config import settings
 from app.crud import crud_user
 from app.db.session import SessionLocal
+from app.db.sharding import sharding_enabled, ShardedSessionLocal, route_to_branch
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from app.db.models.user import User
 from app.crud import crud_user
@@ -14,8 +15,15 @@ from app.crud import crud_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-def get_db() -> Generator:
-    db = SessionLocal()
+def get_db(request: Request) -> Generator:
+    if sharding_enabled():
+        # shifts live in a per-branch database, route by the branch in the path (crud_shift re-routes by payload/shift id)
+        db = ShardedSessionLocal()
+        branch_id = request.path_params.get("branch_id")
+        if branch_id is not None and str(branch_id).isdigit():
+            route_to_branch(db, int(branch_id))
+    else:
+        db = SessionLocal()
     try:
         yield db
     finally:
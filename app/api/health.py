@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db.session import get_engine
+
+router = APIRouter()
+
+
+# liveness: the process is up and serving requests (no database access)
+@router.get("/live")
+def liveness():
+    return {"status": "alive"}
+
+
+# readiness: startup finished and the catalog database answers with the schema in place
+@router.get("/ready")
+def readiness(request: Request):
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Starting up")
+    try:
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1 FROM users LIMIT 1"))
+    except SQLAlchemyError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Database is not reachable or the schema is missing (run python -m app.db.init_db)")
+    return {"status": "ready"}
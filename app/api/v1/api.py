@@ -1,9 +1,10 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import users, branches, auth, shifts
+from app.api.v1.endpoints import users, branches, auth, shifts, constraints
 
 api_router = APIRouter()
 
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(branches.router, prefix="/branches", tags=["branches"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(shifts.router, prefix="/shifts", tags=["shifts"])
\ No newline at end of file
+api_router.include_router(shifts.router, prefix="/shifts", tags=["shifts"])
+api_router.include_router(constraints.router, prefix="/constraints", tags=["constraints"])
\ No newline at end of file
@@ -5,6 +5,7 @@ from app.api import deps
 from app.crud import crud_branch
 from app.schemas.branch import Branch, BranchCreate, BranchWithUsers
 from app.api.deps import get_current_user
+from app.core.cache import branch_cache, roster_cache, staff_search_cache
 from app.db.models.user import User
 
 router = APIRouter()
@@ -21,11 +22,19 @@ def create_new_branch(branch_in: BranchCreate,db: Session = Depends(deps.get_db)
 
 @router.get("/", response_model=List[Branch])
 def read_branches(db: Session = Depends(deps.get_db),skip: int = 0,limit: int = 100):
-    return crud_branch.get_branches(db=db, skip=skip, limit=limit)
+    return crud_branch.get_branches_cached(db=db, skip=skip, limit=limit)
+
+@router.get("/cache-stats")
+def read_cache_stats(current_user: User = Depends(deps.get_current_user)):
+    """
+    Hit ratios of the branch directory / staff roster / staff search caches
+    """
+    return {"branches": branch_cache.stats(), "branch_staff": roster_cache.stats(),
+            "staff_search": staff_search_cache.stats()}
 
 @router.get("/{branch_id}", response_model=BranchWithUsers)
 def read_branch(branch_id: int, db: Session=Depends(deps.get_db),current_user: User = Depends(deps.get_current_user)):
-    db_branch = crud_branch.get_branch(db, branch_id=branch_id)
+    db_branch = crud_branch.get_branch_with_users_cached(db, branch_id=branch_id)
     if not db_branch:
         raise HTTPException(
             status_code=404,
@@ -0,0 +1,130 @@
+from datetime import date
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.core.availability import SLOT_MINUTES, week_start_of
+from app.crud import crud_constraint, crud_shift, crud_user
+from app.schemas.constraint import (
+    ScheduleRequest, ScheduleProposal, ScheduleCommit, AvailabilityCreate, AvailabilityOut,
+    WeekAvailability, AvailabilityCheckRequest, AvailabilityCheckResult
+)
+from app.schemas.shift import ShiftOut
+from app.db.models.user import User
+
+router = APIRouter()
+
+
+@router.post("/schedule/preview", response_model=ScheduleProposal)
+def preview_schedule(
+        request: ScheduleRequest,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    """
+    מציע סידור שבועי מלא לסניף לפי דרישות כוח אדם ואילוצי עובדים (לא נשמר)
+    """
+    if current_user.role.lower() != "store leader":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Forbidden: Only a Store Leader can generate schedules"
+        )
+    return crud_constraint.propose_schedule(db, request=request)
+
+
+@router.post("/schedule/commit", response_model=List[ShiftOut])
+def commit_schedule(
+        schedule: ScheduleCommit,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    """
+    שומר סידור (בדרך כלל אחרי preview ועריכה) - הכל או כלום
+    """
+    if current_user.role.lower() != "store leader":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Forbidden: Only a Store Leader can schedule shifts"
+        )
+    return crud_shift.create_shifts_bulk(db, shifts_in=schedule.shifts)
+
+
+def _check_can_edit_availability(current_user: User, user_id: str):
+    # עובד יכול לנהל רק את הזמינות של עצמו, Store Leader של כולם
+    if current_user.role.lower() != "store leader" and current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Forbidden: You can only manage your own availability"
+        )
+
+
+@router.post("/availability", response_model=AvailabilityOut)
+def create_availability(
+        availability_in: AvailabilityCreate,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    _check_can_edit_availability(current_user, availability_in.user_id)
+    return crud_constraint.create_availability(db, availability_in=availability_in)
+
+
+@router.get("/availability/{user_id}", response_model=List[AvailabilityOut])
+def read_user_availability(
+        user_id: str,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    _check_can_edit_availability(current_user, user_id)
+    return crud_constraint.get_user_availability(db, user_id=user_id)
+
+
+@router.delete("/availability/{availability_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_availability(
+        availability_id: int,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    db_availability = crud_constraint.get_availability(db, availability_id=availability_id)
+    if not db_availability:
+        raise HTTPException(status_code=404, detail="Availability not found")
+    _check_can_edit_availability(current_user, db_availability.user_id)
+    crud_constraint.delete_availability(db, availability_id=availability_id)
+    return None
+
+
+@router.get("/availability/{user_id}/week", response_model=WeekAvailability)
+def read_week_availability(
+        user_id: str,
+        week_start: date,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Compiled availability bitmap of the week (15 minute resolution, weeks start on Monday)
+    """
+    _check_can_edit_availability(current_user, user_id)
+    week_start = week_start_of(week_start)
+    compiled = crud_constraint.get_compiled_availability(db, [user_id])[user_id]
+    return {
+        "user_id": user_id,
+        "week_start": week_start,
+        "resolution_minutes": SLOT_MINUTES,
+        "bitmap": format(compiled.week_bitmap(week_start), "x"),
+    }
+
+
+@router.post("/availability/check", response_model=AvailabilityCheckResult)
+def check_branch_availability(
+        check_in: AvailabilityCheckRequest,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    """
+    מי מהעובדים בסניף זמין למשמרת המוצעת (לפי הזמינות שנרשמה)
+    """
+    if current_user.role.lower() != "store leader":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    staff = crud_user.get_branch_staff(db, branch_id=check_in.branch_id)
+    return crud_constraint.check_roster_availability(
+        db, user_ids=[u.id for u in staff], start_time=check_in.start_time, end_time=check_in.end_time
+    )
@@ -1,11 +1,12 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.api import deps
-from app.crud import crud_shift
-from app.schemas.shift import ShiftOut, ShiftCreate, ShiftSummary, WeeklyReport, WeeklyHoursReport
+from app.crud import crud_shift, crud_branch, crud_shift_change
+from app.schemas.shift import ShiftOut, ShiftCreate, ShiftSummary, WeeklyReport, WeeklyHoursReport, ChainHoursReport, ShiftBatch, ShiftBatchResult, ShiftChangesReport, AvailableCandidate
+from app.core.timeutils import to_naive_utc
 from app.db.models.user import User
-from datetime import date
+from datetime import date, datetime
 
 router = APIRouter()
 
@@ -47,10 +48,50 @@ def delete_existing_shift(
 @router.get("/branch/{branch_id}", response_model=List[ShiftOut])
 def get_shifts_by_branch(
         branch_id: int,
+        include_archived: bool = False,
         db: Session = Depends(deps.get_db),
         current_user: User = Depends(deps.get_current_user)
 ):
-    return crud_shift.get_branch_shifts(db, branch_id=branch_id)
+    # include_archived=true מחזיר גם היסטוריה מטבלת הארכיון (לייצוא)
+    return crud_shift.get_branch_shifts(db, branch_id=branch_id, include_archived=include_archived)
+
+
+@router.get("/changes", response_model=ShiftChangesReport)
+def get_shift_changes(
+        branch_id: int,
+        since: int = 0,
+        limit: int = Query(1000, ge=1, le=5000),
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Delta sync: shifts of the branch inserted / updated / deleted after sequence `since`
+    """
+    return crud_shift_change.get_changes_since(db, branch_id=branch_id, since=since, limit=limit)
+
+
+@router.get("/branch/{branch_id}/available", response_model=List[AvailableCandidate])
+def get_available_employees(
+        branch_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        position: Optional[str] = None,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    """
+    מי פנוי להחליף במשמרת (למשל עובד שחלה) - ממוין לפי שעות שכבר שובצו השבוע
+    """
+    if current_user.role.lower() != "store leader":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    # one param may be "...Z" and the other naive, compare them the way they are stored
+    start_time, end_time = to_naive_utc(start_time), to_naive_utc(end_time)
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+
+    return crud_shift.get_available_candidates(
+        db, branch_id=branch_id, start_time=start_time, end_time=end_time, position=position
+    )
 
 
 @router.get("/summary/{branch_id}", response_model=ShiftSummary)  # תיקנתי מ-summery ל-summary
@@ -111,6 +152,21 @@ def update_existing_shift(
     return updated_shift
 
 
+@router.patch("/batch", response_model=ShiftBatchResult)
+def apply_shift_batch(
+        batch: ShiftBatch,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Update / move / delete many shifts at once (drag-and-drop on the board), all or nothing
+    """
+    if current_user.role.lower() != "store leader":
+        raise HTTPException(status_code=403, detail="Only a Store Leader can update shifts")
+
+    return crud_shift.apply_shift_batch(db, batch=batch)
+
+
 @router.get("/weekly-hours/{branch_id}", response_model=WeeklyHoursReport)
 def get_weekly_hours_by_position(
         branch_id: int,
@@ -131,6 +187,23 @@ def get_weekly_hours_by_position(
     }
 
 
+@router.get("/weekly-hours", response_model=ChainHoursReport)
+def get_chain_weekly_hours_by_position(
+        start_date: date,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Hours per position for every branch in the chain for a specific week
+    """
+    branch_ids = crud_branch.get_branch_ids(db)
+    hours = crud_shift.get_chain_hours_by_position(db, branch_ids=branch_ids, start_date=start_date)
+    return {
+        "week_start": str(start_date),
+        "branches": hours
+    }
+
+
 @router.get("/employee/{branch_id}/{user_id}", response_model=List[ShiftOut])
 def get_shifts_by_employee(
         branch_id: int,
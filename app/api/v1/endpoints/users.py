@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Any, List
+from typing import Any, List, Optional
 from app.api import deps
 from app.crud import crud_user
-from app.schemas.user import UserCreate, UserOut
+from app.schemas.user import UserCreate, UserOut, UserSearchResult
 from app.api.deps import oauth2_scheme
 from app.db.models.user import User  # וודא שהשורה הזו קיימת
 
@@ -34,6 +34,24 @@ def read_user_me(
     return current_user
 
 
+@router.get("/search", response_model=List[UserSearchResult])
+def search_staff(
+        q: str = Query(..., min_length=1, max_length=64),
+        branch_id: Optional[int] = None,
+        limit: int = Query(10, ge=1, le=50),
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_user)
+):
+    """
+    חיפוש עובד לפי תחילת שם / אימייל (עברית ואנגלית) לבורר העובדים בטופס המשמרת.
+    בלי branch_id - חיפוש בכל הרשת
+    """
+    if current_user.role.lower() != "store leader":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    return crud_user.search_staff(db, q=q, branch_id=branch_id, limit=limit)
+
+
 @router.get("/branch-staff/{branch_id}", response_model=List[UserOut])
 def get_staff_by_branch(
         branch_id: int,
@@ -47,5 +65,4 @@ def get_staff_by_branch(
     if current_user.role.lower() != "store leader":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    users = db.query(User).filter(User.branch_id == branch_id).all()
-    return users
\ No newline at end of file
+    return crud_user.get_branch_staff(db, branch_id=branch_id)
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Weekly availability bitmaps.
+
+A week (Monday 00:00 -> next Monday 00:00) is 7 * 96 bits, one bit per 15 minutes, stored in a Python int.
+A shift is allowed when all its bits are set: (bitmap & mask) == mask.
+CompiledAvailability turns a user's availability records into these bitmaps once
+(cached in app.core.cache.availability_cache) so checks never go to the database.
+"""
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from app.core.timeutils import to_naive_utc
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+WEEK_SLOTS = 7 * SLOTS_PER_DAY
+
+
+def week_start_of(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def window_mask(start: Optional[time], end: Optional[time]) -> int:
+    """
+    Bits of one day covered by [start, end). No start = from midnight, no end = until midnight.
+    """
+    first = 0 if start is None else (start.hour * 60 + start.minute) // SLOT_MINUTES
+    last = SLOTS_PER_DAY if end is None else -(-(end.hour * 60 + end.minute) // SLOT_MINUTES)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+@lru_cache(maxsize=4096)
+def shift_mask(week_start: date, start: datetime, end: datetime) -> int:
+    """
+    Bits of the week starting at week_start touched by the shift (start rounded down, end rounded up,
+    so a shift is only allowed if every quarter it touches is available). Parts outside the week are ignored.
+    """
+    origin = datetime.combine(week_start, time.min)
+    first = max(0, int((start - origin).total_seconds() // 60) // SLOT_MINUTES)
+    last = min(WEEK_SLOTS, -(-int((end - origin).total_seconds() // 60) // SLOT_MINUTES))
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+class CompiledAvailability:
+    def __init__(self, records: Iterable):
+        records = list(records)
+        # nothing recorded = always available, the common case stays a single flag check
+        self.unrestricted = not records
+        # with a recurring "available" pattern, days/hours outside of it count as unavailable
+        self.has_pattern = False
+        self.recurring_available = [0] * 7
+        self.recurring_unavailable = [0] * 7
+        self.dated_available: Dict[date, int] = {}
+        self.dated_unavailable: Dict[date, int] = {}
+        self._weeks: Dict[date, int] = {}
+
+        for r in records:
+            mask = window_mask(r.start_time, r.end_time)
+            if r.weekday is not None:
+                target = self.recurring_available if r.kind == "available" else self.recurring_unavailable
+                target[r.weekday] |= mask
+                if r.kind == "available":
+                    self.has_pattern = True
+            elif r.date is not None:
+                target = self.dated_available if r.kind == "available" else self.dated_unavailable
+                target[r.date] = target.get(r.date, 0) | mask
+
+    def day_mask(self, day: date) -> int:
+        weekday = day.weekday()
+        # recurring pattern first, then that date's records override it (available, then unavailable)
+        mask = self.recurring_available[weekday] if self.has_pattern else DAY_MASK
+        mask &= ~self.recurring_unavailable[weekday]
+        mask |= self.dated_available.get(day, 0)
+        mask &= ~self.dated_unavailable.get(day, 0)
+        return mask & DAY_MASK
+
+    def week_bitmap(self, week_start: date) -> int:
+        bitmap = self._weeks.get(week_start)
+        if bitmap is None:
+            bitmap = 0
+            for i in range(7):
+                bitmap |= self.day_mask(week_start + timedelta(days=i)) << (i * SLOTS_PER_DAY)
+            if len(self._weeks) > 52:
+                self._weeks.clear()
+            self._weeks[week_start] = bitmap
+        return bitmap
+
+    def is_allowed(self, start: datetime, end: datetime) -> bool:
+        if self.unrestricted:
+            return True
+        # bitmaps are in naive (stored) time; aware input ("...Z") is converted the same way shifts are
+        start, end = to_naive_utc(start), to_naive_utc(end)
+        week = week_start_of(start.date())
+        # a shift can run past Sunday midnight into the next week
+        while datetime.combine(week, time.min) < end:
+            mask = shift_mask(week, start, end)
+            if self.week_bitmap(week) & mask != mask:
+                return False
+            week += timedelta(days=7)
+        return True
@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+
+class ReadThroughCache:
+    """
+    Small in-process read-through cache.
+    Values are loaded once through `loader` and kept until they are invalidated or `ttl` seconds pass
+    (invalidation only reaches this process, the TTL bounds how stale other uvicorn workers can get).
+    At most `max_entries` keys are kept, the oldest one is dropped first.
+    Store plain/pydantic objects here, never live SQLAlchemy instances
+    (they are bound to the session that loaded them).
+    """
+
+    def __init__(self, name: str, ttl: float = 30.0, max_entries: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (value, expires_at); insertion ordered, so the first key is the oldest
+        self._data: Dict[Hashable, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        # bumped on every invalidation so a load that raced with a write is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key: Hashable, now: float):
+        # call with the lock held; (found, value)
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        if entry[1] <= now:
+            del self._data[key]
+            return False, None
+        return True, entry[0]
+
+    def _store(self, key: Hashable, value: Any):
+        # call with the lock held
+        self._data.pop(key, None)
+        while len(self._data) >= self.max_entries:
+            del self._data[next(iter(self._data))]
+        self._data[key] = (value, time.monotonic() + self.ttl)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            found, value = self._lookup(key, time.monotonic())
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, value)
+        return value
+
+    def get_many_or_load(self, keys: Iterable[Hashable], loader: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """
+        Like get_or_load for many keys, all misses are loaded with a single loader(missing_keys) call
+        """
+        with self._lock:
+            now = time.monotonic()
+            found = {}
+            missing = []
+            for key in keys:
+                hit, value = self._lookup(key, now)
+                if hit:
+                    found[key] = value
+                else:
+                    missing.append(key)
+            self.hits += len(found)
+            self.misses += len(missing)
+            generation = self._generation
+
+        if missing:
+            loaded = loader(missing)
+            with self._lock:
+                if generation == self._generation:
+                    for key, value in loaded.items():
+                        self._store(key, value)
+            found.update(loaded)
+        return found
+
+    def invalidate(self, key: Hashable = None) -> None:
+        # key=None clears everything
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# Branch directory: key "list" (default page only) -> List[Branch], key <branch_id> -> BranchWithUsers
+branch_cache = ReadThroughCache("branches")
+
+# Staff roster per branch: key <branch_id> -> List[UserOut]
+roster_cache = ReadThroughCache("branch_staff")
+
+# Staff prefix search: key <branch_id> or "chain" (whole chain) -> StaffSearchIndex
+staff_search_cache = ReadThroughCache("staff_search")
+
+# Compiled availability per user: key <user_id> -> CompiledAvailability (one key per employee, so a bigger cap)
+availability_cache = ReadThroughCache("availability", max_entries=50000)
@@ -1,3 +1,5 @@
+from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -6,9 +8,33 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     DATABASE_URL: str
+    # אם מוגדר: כל סניף מקבל קובץ SQLite משלו למשמרות (users/branches נשארים ב-DATABASE_URL)
+    SHARD_DATABASE_DIR: Optional[str] = None
+    # משמרות שהסתיימו לפני יותר מזה עוברות לטבלת הארכיון (shifts_archive)
+    SHIFT_ARCHIVE_AFTER_DAYS: int = 365
+    # כמה זמן נשמרות רשומות ב-shift_changes (לקוח שלא סנכרן מעבר לזה יקבל resync מלא)
+    SHIFT_CHANGE_RETENTION_DAYS: int = 7
+    # יצירת טבלאות בעליית השרת (לפיתוח / בדיקות). בפרודקשן מריצים python -m app.db.init_db כשלב נפרד
+    CREATE_SCHEMA_ON_STARTUP: bool = False
 
     # טעינה אוטומטית מקובץ .env
     model_config = SettingsConfigDict(env_file=".env")
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+class _LazySettings:
+    """
+    Proxy for Settings: the environment / .env is read on first attribute access, not at import time
+    """
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+
+settings = _LazySettings()
 
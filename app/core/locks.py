@@ -0,0 +1,35 @@
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Hashable, List
+
+
+class StripedLock:
+    """
+    Fixed pool of locks, a key always maps to the same stripe.
+    Writes for different keys (usually) take different locks and run in parallel,
+    writes for the same key are serialized.
+    """
+
+    def __init__(self, stripes: int = 64):
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(stripes)]
+
+    def _index(self, key: Hashable) -> int:
+        # crc32 instead of hash() so the mapping is stable between runs
+        return zlib.crc32(str(key).encode("utf-8")) % len(self._locks)
+
+    @contextmanager
+    def hold(self, *keys: Hashable):
+        # several keys (e.g. shift moved between employees): lock in index order to avoid deadlocks
+        indexes = sorted({self._index(k) for k in keys if k is not None})
+        for i in indexes:
+            self._locks[i].acquire()
+        try:
+            yield
+        finally:
+            for i in reversed(indexes):
+                self._locks[i].release()
+
+
+# Per-employee lock for shift writes (overlap check + insert/update must be atomic)
+shift_write_locks = StripedLock()
@@ -0,0 +1,165 @@
+"""
+In-memory weekly schedule generator.
+
+Input: the staffing requirements (headcount per position and bucket), the roster with per-employee
+constraints and the shifts people already have that week. Output: proposed shifts + what could not be filled.
+Nothing here touches the database - crud_constraint loads everything in a couple of queries and
+calls generate_schedule().
+
+The solver is greedy + a repair pass:
+1. Slots are filled hardest first (fewest eligible employees), each with the eligible employee that
+   has the fewest hours so far (keeps the week fair).
+2. For every slot still open we try one swap: hand one of a blocking employee's slots to someone free,
+   then give the open slot to the freed employee.
+"""
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Same buckets as the weekly board (see crud_shift.get_weekly_board)
+BUCKET_TIMES = {
+    "morning": (time(8, 0), time(15, 0)),
+    "afternoon": (time(11, 0), time(19, 30)),
+    "evening": (time(15, 0), time(22, 15)),
+}
+
+
+@dataclass
+class Slot:
+    day: date
+    bucket: str
+    position: str
+    start: datetime
+    end: datetime
+    hours: float
+    user_id: Optional[str] = None
+
+
+@dataclass
+class Employee:
+    user_id: str
+    max_hours: float
+    positions: Optional[set] = None          # None = can work any position
+    unavailable_dates: set = field(default_factory=set)
+    hours: float = 0.0
+    # existing shifts (sorted by start) - only used for overlap tests
+    busy: List[Tuple[datetime, datetime]] = field(default_factory=list)
+    busy_days: set = field(default_factory=set)
+    # day -> slot we gave this employee (one shift per day)
+    assigned: Dict[date, Slot] = field(default_factory=dict)
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        i = bisect_left(self.busy, (start, start))
+        # the interval just before may still run into ours
+        if i > 0 and self.busy[i - 1][1] > start:
+            return True
+        return i < len(self.busy) and self.busy[i][0] < end
+
+
+def build_slots(week_start: date, requirements: list) -> List[Slot]:
+    """
+    requirements: objects with position, bucket, headcount and optional weekdays (0=Monday .. 6=Sunday)
+    """
+    slots = []
+    for day_offset in range(7):
+        day = week_start + timedelta(days=day_offset)
+        for req in requirements:
+            if req.weekdays is not None and day.weekday() not in req.weekdays:
+                continue
+            start_t, end_t = BUCKET_TIMES[req.bucket]
+            start, end = datetime.combine(day, start_t), datetime.combine(day, end_t)
+            hours = (end - start).total_seconds() / 3600
+            for _ in range(req.headcount):
+                slots.append(Slot(day=day, bucket=req.bucket, position=req.position, start=start, end=end, hours=hours))
+    return slots
+
+
+class ScheduleSolver:
+    def __init__(self, slots: List[Slot], employees: List[Employee],
+                 is_available: Optional[Callable[[str, datetime, datetime], bool]] = None):
+        self.slots = slots
+        self.employees = employees
+        # extra availability rule (recorded availability), checked last since it is the most expensive
+        self.is_available = is_available
+
+    def _static_ok(self, e: Employee, slot: Slot) -> bool:
+        # everything that doesn't depend on the other assignments
+        if e.positions is not None and slot.position not in e.positions:
+            return False
+        if slot.day in e.unavailable_dates or slot.day in e.busy_days:
+            return False
+        if e.overlaps(slot.start, slot.end):
+            return False
+        if self.is_available is not None and not self.is_available(e.user_id, slot.start, slot.end):
+            return False
+        return True
+
+    def _fits(self, e: Employee, slot: Slot) -> bool:
+        return slot.day not in e.assigned and e.hours + slot.hours <= e.max_hours
+
+    def _assign(self, e: Employee, slot: Slot):
+        slot.user_id = e.user_id
+        e.assigned[slot.day] = slot
+        e.hours += slot.hours
+
+    def _unassign(self, e: Employee, slot: Slot):
+        slot.user_id = None
+        del e.assigned[slot.day]
+        e.hours -= slot.hours
+
+    def solve(self) -> List[Slot]:
+        # candidates per slot are computed once (all the "static" rules)
+        candidates = {id(s): [e for e in self.employees if self._static_ok(e, s)] for s in self.slots}
+
+        # 1. greedy, hardest slots first
+        for slot in sorted(self.slots, key=lambda s: (len(candidates[id(s)]), s.start)):
+            best = None
+            for e in candidates[id(slot)]:
+                if self._fits(e, slot) and (best is None or e.hours < best.hours):
+                    best = e
+            if best is not None:
+                self._assign(best, slot)
+
+        # 2. repair: free someone for each open slot by moving one of their slots to another employee
+        # slots nobody else can take over; only grows while nothing changes, so it's reset after a swap
+        self._stuck = set()
+        for slot in self.slots:
+            if slot.user_id is None:
+                self._repair(slot, candidates)
+
+        return self.slots
+
+    def _repair(self, slot: Slot, candidates: dict):
+        for a in candidates[id(slot)]:
+            if self._fits(a, slot):
+                # an earlier repair may have freed a
+                self._assign(a, slot)
+                return
+            # slots of `a` that block this one: same day, or any slot when a is out of hours
+            blocking = [a.assigned[slot.day]] if slot.day in a.assigned else list(a.assigned.values())
+            for other in blocking:
+                if id(other) in self._stuck or a.hours - other.hours + slot.hours > a.max_hours:
+                    continue
+                b = next((b for b in candidates[id(other)] if b is not a and self._fits(b, other)), None)
+                if b is None:
+                    self._stuck.add(id(other))
+                    continue
+                # moving `other` to b frees the day / the hours a needed
+                self._unassign(a, other)
+                self._assign(b, other)
+                self._assign(a, slot)
+                self._stuck.clear()
+                return
+
+
+def generate_schedule(week_start: date, requirements: list, employees: List[Employee],
+                      is_available: Optional[Callable[[str, datetime, datetime], bool]] = None):
+    """
+    Returns (filled slots, unfilled slots)
+    """
+    slots = build_slots(week_start, requirements)
+    ScheduleSolver(slots, employees, is_available=is_available).solve()
+    filled = [s for s in slots if s.user_id is not None]
+    unfilled = [s for s in slots if s.user_id is None]
+    return filled, unfilled
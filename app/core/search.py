@@ -0,0 +1,80 @@
+"""
+Prefix search over staff names / emails for the employee picker.
+
+Every user is split into normalized tokens (first name, last name and the parts of the email before the @;
+the domain is the same for everyone and would match every "co"/"de" prefix).
+The tokens are kept in one sorted list, so all tokens starting with a prefix are a single bisect range
+(same lookup as a prefix trie, without a node per letter). StaffSearchIndex is built once per branch
+and cached in app.core.cache.staff_search_cache.
+
+Normalization makes Hebrew and Latin names searchable the way people type them:
+case folding, no accents / niqqud, and Hebrew final letters equal to their regular form (so "דנ" finds "דן").
+"""
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Iterable, List
+
+_HEBREW_FINALS = str.maketrans("ךםןףץ", "כמנפצ")
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    # accents on Latin letters and Hebrew niqqud are combining marks
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.casefold().translate(_HEBREW_FINALS)
+
+
+def tokenize(text: str) -> List[str]:
+    # "בן-דוד", "o'brien", "dana.cohen" -> separate tokens
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class StaffSearchIndex:
+    def __init__(self, users: Iterable):
+        """
+        users: objects with id, first_name, last_name, email (UserSearchResult / User rows)
+        """
+        self.users = list(users)
+        entries = set()
+        for i, u in enumerate(self.users):
+            local_part = (u.email or "").split("@")[0]
+            for token in tokenize(f"{u.first_name} {u.last_name} {local_part}"):
+                entries.add((token, i))
+        self._entries = sorted(entries)
+        self._tokens = [token for token, _ in self._entries]
+        # for ranking: name tokens (exact matches win) and the sort key by name
+        self._name_tokens = [set(tokenize(f"{u.first_name} {u.last_name}")) for u in self.users]
+        self._order = [(normalize(u.first_name), normalize(u.last_name), u.id) for u in self.users]
+
+    def _prefix_matches(self, prefix: str) -> set:
+        position = bisect_left(self._tokens, prefix)
+        matches = set()
+        while position < len(self._entries) and self._tokens[position].startswith(prefix):
+            matches.add(self._entries[position][1])
+            position += 1
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+        Users matching every word of the query as a prefix of one of their tokens
+        ("dan co" -> Dana Cohen). Exact name matches first, then by name.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        # longest (most selective) word first, the others only narrow it down
+        candidates = None
+        for word in sorted(set(words), key=len, reverse=True):
+            matches = self._prefix_matches(word)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+
+        def rank(i: int):
+            exact = sum(1 for w in words if w in self._name_tokens[i])
+            return -exact, self._order[i]
+
+        return [self.users[i] for i in heapq.nsmallest(limit, candidates, key=rank)]
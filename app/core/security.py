@@ -5,9 +5,6 @@ from typing import Any, Union
 from app.core.config import settings
 
 
-SECRET_KEY = settings.SECRET_KEY
-ALGORITHM = settings.ALGORITHM
-
 # Function to hash password using bcrypt
 # bcrypt is the modern standard for password hashing
 # It automatically handles salt generation and is secure
@@ -38,7 +35,7 @@ def create_access_token(subject: Union[str,Any], expires_delta: timedelta =None)
         expire = datetime.utcnow() + timedelta(minutes=30)
 
     to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode,SECRET_KEY,algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode,settings.SECRET_KEY,algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
@@ -0,0 +1,11 @@
+from datetime import datetime, timezone
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """
+    Times are stored naive (SQLite keeps no offset). An aware value ("...Z" from toISOString())
+    is converted to UTC and its tzinfo dropped, so it can be compared with what comes back from the DB.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -1,6 +1,7 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from app.core.cache import branch_cache
 from app.db.models.branch import Branch
-from app.schemas.branch import BranchCreate
+from app.schemas.branch import BranchCreate, Branch as BranchSchema, BranchWithUsers
 
 def get_branch(db: Session, branch_id: int):
     return db.query(Branch).filter(Branch.id == branch_id).first()
@@ -8,6 +9,34 @@ def get_branch(db: Session, branch_id: int):
 def get_branches(db: Session, skip: int=0, limit: int=100):
     return db.query(Branch).offset(skip).limit(limit).all()
 
+def get_branches_cached(db: Session, skip: int=0, limit: int=100):
+    """
+    Read-through version of get_branches (branch directory rarely changes).
+    Only the default page is cached, other skip/limit values (unauthenticated query params) go to the DB.
+    """
+    def load():
+        return [BranchSchema.model_validate(b) for b in get_branches(db, skip=skip, limit=limit)]
+    if skip != 0 or limit != 100:
+        return load()
+    return branch_cache.get_or_load("list", load)
+
+def get_branch_with_users_cached(db: Session, branch_id: int):
+    """
+    Read-through branch + users. On a miss the users are eager loaded in one extra query
+    instead of lazy loading them while serializing.
+    """
+    def load():
+        db_branch = db.query(Branch).options(selectinload(Branch.users)).filter(Branch.id == branch_id).first()
+        if not db_branch:
+            return None
+        return BranchWithUsers.model_validate(db_branch)
+
+    branch = branch_cache.get_or_load(branch_id, load)
+    if branch is None:
+        # don't keep "not found" around, the branch may be created later
+        branch_cache.invalidate(branch_id)
+    return branch
+
 def create_branch(db: Session, branch_in: BranchCreate):
     db_branch = Branch(
         name=branch_in.name,
@@ -16,7 +45,11 @@ def create_branch(db: Session, branch_in: BranchCreate):
     db.add(db_branch)
     db.commit()
     db.refresh(db_branch)
+    branch_cache.invalidate()
     return db_branch
 
 def get_branch_by_name(db: Session, branch_name: str):
     return db.query(Branch).filter(Branch.name == branch_name).first()
+
+def get_branch_ids(db: Session):
+    return [branch_id for (branch_id,) in db.query(Branch.id).order_by(Branch.id).all()]
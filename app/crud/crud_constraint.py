@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy.orm import Session
+from app.core.availability import CompiledAvailability
+from app.core.cache import availability_cache
+from app.core.scheduler import Employee, generate_schedule
+from app.db.models.constraint import Availability
+from app.db.models.shift import Shift
+from app.db.models.user import User
+from app.db.sharding import route_to_branch
+from app.schemas.constraint import ScheduleRequest, AvailabilityCreate
+
+
+def create_availability(db: Session, availability_in: AvailabilityCreate):
+    db_availability = Availability(**availability_in.model_dump())
+    db.add(db_availability)
+    db.commit()
+    db.refresh(db_availability)
+    availability_cache.invalidate(db_availability.user_id)
+    return db_availability
+
+
+def get_availability(db: Session, availability_id: int):
+    return db.query(Availability).filter(Availability.id == availability_id).first()
+
+
+def get_user_availability(db: Session, user_id: str):
+    return db.query(Availability).filter(Availability.user_id == user_id).order_by(
+        Availability.weekday, Availability.date, Availability.start_time
+    ).all()
+
+
+def delete_availability(db: Session, availability_id: int) -> bool:
+    db_availability = get_availability(db, availability_id)
+    if not db_availability:
+        return False
+    user_id = db_availability.user_id
+    db.delete(db_availability)
+    db.commit()
+    availability_cache.invalidate(user_id)
+    return True
+
+
+def get_compiled_availability(db: Session, user_ids: List[str]):
+    """
+    {user_id: CompiledAvailability} for a whole roster, cached; all misses are loaded in one query
+    """
+    def load(missing):
+        records = {user_id: [] for user_id in missing}
+        for r in db.query(Availability).filter(Availability.user_id.in_(missing)).all():
+            records[r.user_id].append(r)
+        return {user_id: CompiledAvailability(rows) for user_id, rows in records.items()}
+
+    return availability_cache.get_many_or_load(user_ids, load)
+
+
+def check_roster_availability(db: Session, user_ids: List[str], start_time: datetime, end_time: datetime):
+    compiled = get_compiled_availability(db, user_ids)
+    allowed, blocked = [], []
+    for user_id in user_ids:
+        (allowed if compiled[user_id].is_allowed(start_time, end_time) else blocked).append(user_id)
+    return {"allowed": allowed, "blocked": blocked}
+
+
+def propose_schedule(db: Session, request: ScheduleRequest):
+    """
+    Build a proposed week for the branch. A few queries (roster, that week's shifts, availability),
+    the rest runs in memory (app.core.scheduler). Nothing is saved.
+    """
+    has_shard = route_to_branch(db, request.branch_id)
+    week_start = datetime.combine(request.week_start, datetime.min.time())
+    week_end = week_start + timedelta(days=7)
+
+    constraints = {c.user_id: c for c in request.constraints}
+    staff = db.query(User).filter(User.branch_id == request.branch_id).all()
+
+    employees = {}
+    for user in staff:
+        c = constraints.get(user.id)
+        max_hours = request.default_max_hours_per_week
+        if c is not None and c.max_hours_per_week is not None:
+            max_hours = c.max_hours_per_week
+        employees[user.id] = Employee(
+            user_id=user.id,
+            max_hours=max_hours,
+            positions=set(c.positions) if c is not None and c.positions is not None else None,
+            unavailable_dates=set(c.unavailable_dates) if c is not None else set(),
+        )
+
+    # what people already have this week counts towards their hours and blocks the day
+    existing = db.query(Shift).filter(
+        Shift.user_id.in_(list(employees)),
+        Shift.start_time < week_end,
+        Shift.end_time > week_start
+    ).order_by(Shift.start_time).all() if has_shard else []
+    for s in existing:
+        e = employees[s.user_id]
+        e.busy.append((s.start_time, s.end_time))
+        e.busy_days.add(s.start_time.date())
+        e.hours += (s.end_time - s.start_time).total_seconds() / 3600
+
+    # recorded availability (bitmaps, no extra queries once cached)
+    availability = get_compiled_availability(db, list(employees))
+    filled, unfilled = generate_schedule(
+        request.week_start, request.requirements, list(employees.values()),
+        is_available=lambda user_id, start, end: availability[user_id].is_allowed(start, end)
+    )
+
+    return {
+        "branch_id": request.branch_id,
+        "week_start": request.week_start,
+        "shifts": [
+            {
+                "user_id": slot.user_id,
+                "branch_id": request.branch_id,
+                "start_time": slot.start,
+                "end_time": slot.end,
+                "position": slot.position,
+                "notes": None,
+            }
+            for slot in sorted(filled, key=lambda s: (s.start, s.position, s.user_id))
+        ],
+        "unfilled": [{"date": s.day, "bucket": s.bucket, "position": s.position} for s in unfilled],
+        "filled_count": len(filled),
+        "required_count": len(filled) + len(unfilled),
+    }
@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import Callable, Dict
+from sqlalchemy import func, insert, text
+from sqlalchemy.orm import Session
+from app.crud.crud_shift_archive import ARCHIVE_COLUMNS
+from app.db.models.shift import Shift, ArchivedShift
+from app.db.models.shift_change import ShiftChange
+from app.db.sharding import SHARD_ID_SPAN, create_shard, route_to_branch
+
+
+def shard_shift_id(branch_id: int, catalog_id: int) -> int:
+    # catalog ids are all below SHARD_ID_SPAN, so the old id becomes the offset inside the branch's range
+    return branch_id * SHARD_ID_SPAN + catalog_id
+
+
+def _start_change_log_after(shard_db: Session, seq: int):
+    """
+    Make the shard's change log continue after `seq` (sqlite_sequence of the AUTOINCREMENT table),
+    so every cursor a client got from the catalog log is older than the shard log -> resync_required.
+    """
+    conn = shard_db.connection(bind_arguments={"mapper": ShiftChange})
+    current = conn.execute(text("SELECT seq FROM sqlite_sequence WHERE name = 'shift_changes'")).scalar()
+    if current is None:
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('shift_changes', :seq)"), {"seq": seq})
+    elif current < seq:
+        conn.execute(text("UPDATE sqlite_sequence SET seq = :seq WHERE name = 'shift_changes'"), {"seq": seq})
+
+
+def migrate_branch_to_shard(catalog_db: Session, shard_db: Session, branch_id: int, batch_size: int = 500) -> dict:
+    """
+    Move the branch's shifts and archived shifts from the catalog database into its shard.
+    Ids are remapped into the branch's range (shard_shift_id). Each batch is copied (rows already
+    in the shard are skipped) and then deleted from the catalog, so an interrupted run can simply be repeated.
+    catalog_db is a regular session on DATABASE_URL, shard_db a RoutingSession. Run with the API stopped.
+    Returns {"shifts": moved, "archived": moved}.
+    """
+    # branch_ids come from the catalog, so creating the shard here is fine
+    create_shard(branch_id)
+    route_to_branch(shard_db, branch_id)
+
+    # one past the catalog log, +1 so even a client at the very last catalog seq must resync
+    last_catalog_seq = catalog_db.query(func.max(ShiftChange.seq)).scalar() or 0
+    _start_change_log_after(shard_db, last_catalog_seq + 1)
+    shard_db.commit()
+
+    moved = {}
+    for key, model in (("shifts", Shift), ("archived", ArchivedShift)):
+        moved[key] = 0
+        while True:
+            rows = catalog_db.query(model).filter(
+                model.branch_id == branch_id,
+                model.id < SHARD_ID_SPAN
+            ).order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            values = [{c: getattr(r, c) for c in ARCHIVE_COLUMNS} for r in rows]
+            for v in values:
+                v["id"] = shard_shift_id(branch_id, v["id"])
+            existing = {shift_id for (shift_id,) in shard_db.query(model.id).filter(
+                model.id.in_([v["id"] for v in values])
+            ).all()}
+            new_values = [v for v in values if v["id"] not in existing]
+            if new_values:
+                shard_db.execute(insert(model), new_values)
+                if model is Shift:
+                    # clients that resync get the new ids from a full reload, the log just records the inserts
+                    now = datetime.now()
+                    for v in new_values:
+                        shard_db.add(ShiftChange(branch_id=branch_id, shift_id=v["id"], op="insert", changed_at=now))
+            shard_db.commit()
+
+            catalog_db.query(model).filter(model.id.in_([r.id for r in rows])).delete(synchronize_session=False)
+            catalog_db.commit()
+            moved[key] += len(rows)
+
+    # the catalog's log entries of this branch point at ids that no longer exist there
+    catalog_db.query(ShiftChange).filter(ShiftChange.branch_id == branch_id).delete(synchronize_session=False)
+    catalog_db.commit()
+    return moved
+
+
+def migrate_to_shards(catalog_factory: Callable[[], Session], shard_factory: Callable[[], Session],
+                      branch_ids: list, batch_size: int = 500) -> Dict[int, dict]:
+    """
+    One-off move of the single-file shift data into the branch shards, {branch_id: counts}
+    """
+    result = {}
+    for branch_id in branch_ids:
+        catalog_db, shard_db = catalog_factory(), shard_factory()
+        try:
+            result[branch_id] = migrate_branch_to_shard(catalog_db, shard_db, branch_id, batch_size=batch_size)
+        finally:
+            catalog_db.close()
+            shard_db.close()
+    return result
@@ -1,10 +1,97 @@
+from contextlib import contextmanager
+from typing import List, Optional
 from sqlalchemy.orm import Session
-from app.db.models.shift import Shift
-from app.schemas.shift import ShiftCreate
+from app.core.locks import shift_write_locks
+from app.core.availability import week_start_of
+from app.core.timeutils import to_naive_utc
+from app.crud import crud_branch, crud_constraint, crud_user
+from app.crud.crud_shift_change import log_shift_change
+from app.db.models.shift import Shift, ArchivedShift
+from app.db.sharding import sharding_enabled, shard_exists, create_shard, route_to_branch, branch_of_shift, first_shift_id, fan_out
+from app.schemas.shift import ShiftCreate, ShiftBatch, ShiftOut
 from datetime import datetime, date, timedelta
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 from fastapi import HTTPException
 
+
+def _begin_immediate(db: Session):
+    """
+    On SQLite take the database write lock before the overlap check (BEGIN IMMEDIATE),
+    so another process can't insert between our check and our insert.
+    pysqlite only opens a transaction right before DML, so the SELECT would otherwise run unguarded.
+    """
+    connection = db.connection(bind_arguments={"mapper": Shift})
+    if connection.dialect.name != "sqlite":
+        return
+    raw = connection.connection.driver_connection
+    if not raw.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+@contextmanager
+def shift_write_guard(db: Session, *user_ids: str):
+    """
+    Serialize shift writes per employee: striped in-process lock + immediate transaction.
+    Writes for different employees don't wait on each other's lock.
+    """
+    with shift_write_locks.hold(*user_ids):
+        try:
+            _begin_immediate(db)
+            yield
+        except Exception:
+            # release the database write lock right away (e.g. on a conflict)
+            db.rollback()
+            raise
+
+
+def _route_to_shift(db: Session, shift_id: int) -> bool:
+    """
+    In sharded mode pick the shard from the shift id. False if that shard can't contain the shift.
+    """
+    if not sharding_enabled():
+        return True
+    branch_id = branch_of_shift(shift_id)
+    if not shard_exists(branch_id):
+        return False
+    route_to_branch(db, branch_id)
+    return True
+
+
+def _route_for_write(db: Session, branch_id: int):
+    """
+    Route to the branch's shard, creating it on the first write - only for a branch that exists in the
+    catalog, so no request can create shard files for arbitrary ids.
+    """
+    if sharding_enabled() and not shard_exists(branch_id):
+        if crud_branch.get_branch(db, branch_id) is None:
+            raise HTTPException(status_code=404, detail="Branch not found")
+        create_shard(branch_id)
+    route_to_branch(db, branch_id)
+
+
+def _next_shift_id(db: Session, branch_id: int) -> int:
+    """
+    Ids are allocated explicitly (we are inside the write guard): SQLite would reuse the ids of
+    shifts that were moved to the archive, and in sharded mode each shard has its own id range.
+    """
+    last_id = max(
+        db.query(func.max(Shift.id)).scalar() or 0,
+        db.query(func.max(ArchivedShift.id)).scalar() or 0,
+    )
+    if sharding_enabled():
+        last_id = max(last_id, first_shift_id(branch_id) - 1)
+    return last_id + 1
+
+
+def _log_update(db: Session, db_shift: Shift, old_branch_id: int):
+    if old_branch_id != db_shift.branch_id:
+        # for the old branch's clients the shift is gone, for the new one it's new
+        log_shift_change(db, db_shift, "delete", branch_id=old_branch_id)
+        log_shift_change(db, db_shift, "insert")
+    else:
+        log_shift_change(db, db_shift, "update")
+
+
 def check_shift_overlap(db: Session, user_id: str, start_time: datetime, end_time: datetime):
     return db.query(Shift).filter(
         Shift.user_id == user_id,
@@ -15,43 +102,56 @@ def check_shift_overlap(db: Session, user_id: str, start_time: datetime, end_tim
     ).first()
 
 def create_shift(db: Session, shift_in: ShiftCreate):
-    overlap = check_shift_overlap(db, user_id=shift_in.user_id, start_time=shift_in.start_time, end_time=shift_in.end_time)
-    if overlap:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Conflict: Employee has a shift from {overlap.start_time.strftime('%H:%M')} to {overlap.end_time.strftime('%H:%M')}"
-        )
+    _route_for_write(db, shift_in.branch_id)
+    with shift_write_guard(db, shift_in.user_id):
+        overlap = check_shift_overlap(db, user_id=shift_in.user_id, start_time=shift_in.start_time, end_time=shift_in.end_time)
+        if overlap:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Conflict: Employee has a shift from {overlap.start_time.strftime('%H:%M')} to {overlap.end_time.strftime('%H:%M')}"
+            )
 
-    db_shift = Shift(
-        user_id=shift_in.user_id,
-        branch_id=shift_in.branch_id,
-        start_time=shift_in.start_time,
-        end_time=shift_in.end_time,
-        position=shift_in.position,
-        notes=shift_in.notes
-    )
-    db.add(db_shift)
-    db.commit()
+        db_shift = Shift(
+            user_id=shift_in.user_id,
+            branch_id=shift_in.branch_id,
+            start_time=shift_in.start_time,
+            end_time=shift_in.end_time,
+            position=shift_in.position,
+            notes=shift_in.notes
+        )
+        db_shift.id = _next_shift_id(db, shift_in.branch_id)
+        db.add(db_shift)
+        log_shift_change(db, db_shift, "insert")
+        db.commit()
     db.refresh(db_shift)
     return db_shift
 
 def delete_shift(db: Session, shift_id: int) -> bool:
+    if not _route_to_shift(db, shift_id):
+        return False
     db_shift = db.query(Shift).filter(Shift.id == shift_id).first()
     if db_shift:
         db.delete(db_shift)
+        log_shift_change(db, db_shift, "delete")
         db.commit()
         return True
     return False
 
-def get_branch_shifts(db: Session, branch_id: int):
-    return db.query(Shift).filter(Shift.branch_id == branch_id).all()
+def get_branch_shifts(db: Session, branch_id: int, include_archived: bool = False):
+    if not route_to_branch(db, branch_id):
+        return []
+    shifts = db.query(Shift).filter(Shift.branch_id == branch_id).all()
+    if include_archived:
+        shifts += db.query(ArchivedShift).filter(ArchivedShift.branch_id == branch_id).all()
+    return shifts
 
 def get_shift_summary(db: Session, branch_id: int, target_date: date):
+    has_shard = route_to_branch(db, branch_id)
     shifts = db.query(Shift).filter(
         Shift.branch_id == branch_id,
         Shift.start_time >= datetime.combine(target_date, datetime.min.time()),
         Shift.start_time <= datetime.combine(target_date, datetime.max.time())
-    ).all()
+    ).all() if has_shard else []
 
     summary = {"morning": 0, "afternoon": 0, "evening": 0, "total": len(shifts)}
 
@@ -84,6 +184,8 @@ def get_shift_summary(db: Session, branch_id: int, target_date: date):
 
 
 def get_weekly_board(db: Session, branch_id: int, start_date: date):
+    # a branch without a shard still gets its (empty) week
+    has_shard = route_to_branch(db, branch_id)
     weekly_data = []
 
     for i in range(7):
@@ -93,7 +195,7 @@ def get_weekly_board(db: Session, branch_id: int, start_date: date):
             Shift.branch_id == branch_id,
             Shift.start_time >= datetime.combine(current_date, datetime.min.time()),
             Shift.start_time <= datetime.combine(current_date, datetime.max.time())
-        ).all()
+        ).all() if has_shard else []
 
         # Initialize position-based structure
         day_info = {
@@ -206,6 +308,8 @@ def get_hours_by_position_weekly(db: Session, branch_id: int, start_date: date):
     Calculate total hours worked per position for a week
     Returns a dictionary with position as key and total hours as value
     """
+    if not route_to_branch(db, branch_id):
+        return {}
     end_date = start_date + timedelta(days=6)
     
     shifts = db.query(Shift).filter(
@@ -233,47 +337,286 @@ def get_hours_by_position_weekly(db: Session, branch_id: int, start_date: date):
 
 def get_shifts_by_employee(db: Session, branch_id: int, user_id: str):
     """
-    Get all shifts for a specific employee in a branch
+    Get all shifts for a specific employee in a branch (hot + archived)
     """
+    if not route_to_branch(db, branch_id):
+        return []
     shifts = db.query(Shift).filter(
         Shift.branch_id == branch_id,
         Shift.user_id == user_id
     ).order_by(Shift.start_time.desc()).all()
-    
-    return shifts
+
+    # history older than the archive horizon lives in shifts_archive
+    archived = db.query(ArchivedShift).filter(
+        ArchivedShift.branch_id == branch_id,
+        ArchivedShift.user_id == user_id
+    ).all()
+    if not archived:
+        return shifts
+
+    return sorted(shifts + archived, key=lambda s: s.start_time, reverse=True)
 
 
 def update_shift(db: Session, shift_id: int, shift_in: ShiftCreate):
+    if not _route_to_shift(db, shift_id):
+        return None
     # 1. מציאת המשמרת הקיימת
     db_shift = db.query(Shift).filter(Shift.id == shift_id).first()
     if not db_shift:
         return None
 
-    # 2. בדיקת חפיפה (מוודאים שהזמן החדש לא מתנגש עם משמרות אחרות של אותו עובד)
-    # אנחנו מחפשים חפיפה, אבל מוסיפים תנאי שה-ID לא יהיה ה-ID של המשמרת שאנחנו עורכים כרגע
-    overlap = db.query(Shift).filter(
-        Shift.user_id == shift_in.user_id,
-        Shift.id != shift_id,  # אל תבדוק חפיפה מול עצמי
-        and_(
-            Shift.start_time < shift_in.end_time,
-            Shift.end_time > shift_in.start_time
-        )
-    ).first()
+    if sharding_enabled() and shift_in.branch_id != db_shift.branch_id:
+        # the shift would have to move to another database file
+        raise HTTPException(status_code=400, detail="Moving a shift to another branch is not supported in sharded mode")
 
-    if overlap:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Conflict: Employee already has another shift from {overlap.start_time.strftime('%H:%M')} to {overlap.end_time.strftime('%H:%M')}"
-        )
+    # נועלים גם את העובד הקודם וגם את החדש (אם המשמרת עוברת לעובד אחר)
+    with shift_write_guard(db, db_shift.user_id, shift_in.user_id):
+        # reload inside the guard, the shift may have been changed/deleted while we waited
+        db.expire(db_shift)
+        db_shift = db.query(Shift).filter(Shift.id == shift_id).first()
+        if not db_shift:
+            return None
+
+        # 2. בדיקת חפיפה (מוודאים שהזמן החדש לא מתנגש עם משמרות אחרות של אותו עובד)
+        # אנחנו מחפשים חפיפה, אבל מוסיפים תנאי שה-ID לא יהיה ה-ID של המשמרת שאנחנו עורכים כרגע
+        overlap = db.query(Shift).filter(
+            Shift.user_id == shift_in.user_id,
+            Shift.id != shift_id,  # אל תבדוק חפיפה מול עצמי
+            and_(
+                Shift.start_time < shift_in.end_time,
+                Shift.end_time > shift_in.start_time
+            )
+        ).first()
 
-    # 3. עדכון הנתונים
-    db_shift.start_time = shift_in.start_time
-    db_shift.end_time = shift_in.end_time
-    db_shift.position = shift_in.position
-    db_shift.notes = shift_in.notes
-    db_shift.user_id = shift_in.user_id
-    db_shift.branch_id = shift_in.branch_id
+        if overlap:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Conflict: Employee already has another shift from {overlap.start_time.strftime('%H:%M')} to {overlap.end_time.strftime('%H:%M')}"
+            )
 
-    db.commit()
+        # 3. עדכון הנתונים
+        old_branch_id = db_shift.branch_id
+        db_shift.start_time = shift_in.start_time
+        db_shift.end_time = shift_in.end_time
+        db_shift.position = shift_in.position
+        db_shift.notes = shift_in.notes
+        db_shift.user_id = shift_in.user_id
+        db_shift.branch_id = shift_in.branch_id
+        _log_update(db, db_shift, old_branch_id)
+
+        db.commit()
     db.refresh(db_shift)
-    return db_shift
\ No newline at end of file
+    return db_shift
+
+def _check_overlaps_set_based(db: Session, final: List[dict], exclude_ids: List[int] = ()):
+    """
+    Overlap check for many shifts at once: one query for the other shifts of the employees involved
+    (inside the window the new shifts span), then a sorted sweep per employee.
+    `final` holds dicts with user_id / start_time / end_time.
+    """
+    if not final:
+        return
+    window_start = min(f["start_time"] for f in final)
+    window_end = max(f["end_time"] for f in final)
+    query = db.query(Shift).filter(
+        Shift.user_id.in_({f["user_id"] for f in final}),
+        Shift.start_time < window_end,
+        Shift.end_time > window_start
+    )
+    if exclude_ids:
+        query = query.filter(Shift.id.notin_(exclude_ids))
+
+    by_user = {}
+    for f in final:
+        by_user.setdefault(f["user_id"], []).append((f["start_time"], f["end_time"]))
+    for o in query.all():
+        by_user[o.user_id].append((o.start_time, o.end_time))
+
+    for user_id, intervals in by_user.items():
+        intervals.sort()
+        for (prev_start, prev_end), (cur_start, cur_end) in zip(intervals, intervals[1:]):
+            if cur_start < prev_end:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Conflict: Employee {user_id} would have overlapping shifts "
+                           f"{prev_start.strftime('%d/%m %H:%M')}-{prev_end.strftime('%H:%M')} and "
+                           f"{cur_start.strftime('%d/%m %H:%M')}-{cur_end.strftime('%H:%M')}"
+                )
+
+
+def apply_shift_batch(db: Session, batch: ShiftBatch):
+    """
+    Apply updates, moves (time offsets) and deletes in one transaction.
+    Targets are loaded in one query and conflicts are checked once against the final state,
+    so a drag-and-drop of many shifts costs one round trip.
+    """
+    updates = {u.id: u for u in batch.updates}
+    moves = {m.id: m for m in batch.moves}
+    deletes = set(batch.deletes)
+
+    all_ids = [u.id for u in batch.updates] + [m.id for m in batch.moves] + list(batch.deletes)
+    if len(all_ids) != len(set(all_ids)):
+        raise HTTPException(status_code=400, detail="Each shift can appear only once in a batch")
+    if not all_ids:
+        return {"updated": [], "deleted": []}
+
+    if sharding_enabled():
+        branch_ids = {branch_of_shift(i) for i in all_ids}
+        if len(branch_ids) != 1:
+            raise HTTPException(status_code=400, detail="In sharded mode a batch must target a single branch")
+        if not _route_to_shift(db, all_ids[0]):
+            raise HTTPException(status_code=404, detail="Shift not found")
+
+    def load_targets():
+        targets = {s.id: s for s in db.query(Shift).filter(Shift.id.in_(all_ids)).all()}
+        missing = [i for i in all_ids if i not in targets]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Shifts not found: {missing}")
+        return targets
+
+    targets = load_targets()
+    new_user_ids = {u.user_id for u in updates.values()} | {m.user_id for m in moves.values() if m.user_id}
+    locked_user_ids = {s.user_id for s in targets.values()} | new_user_ids
+
+    with shift_write_guard(db, *locked_user_ids):
+        # reload inside the guard, the shifts may have been changed while we waited
+        db.expire_all()
+        targets = load_targets()
+        if any(s.user_id not in locked_user_ids for s in targets.values()):
+            raise HTTPException(status_code=409, detail="Shifts were changed by someone else, please retry")
+
+        # 1. מצב סופי של כל משמרת שנשארת (בלי לגעת עדיין ב-DB)
+        final = {}
+        for shift_id, u in updates.items():
+            if sharding_enabled() and u.branch_id != targets[shift_id].branch_id:
+                raise HTTPException(status_code=400, detail="Moving a shift to another branch is not supported in sharded mode")
+            final[shift_id] = u.model_dump(exclude={"id"})
+        for shift_id, m in moves.items():
+            s = targets[shift_id]
+            offset = timedelta(minutes=m.offset_minutes)
+            final[shift_id] = {
+                "user_id": m.user_id or s.user_id,
+                "branch_id": s.branch_id,
+                "start_time": s.start_time + offset,
+                "end_time": s.end_time + offset,
+                "position": s.position,
+                "notes": s.notes,
+            }
+
+        # 2. בדיקת חפיפות אחת לכל ה-batch: משמרות אחרות של אותם עובדים בטווח הרלוונטי
+        _check_overlaps_set_based(db, list(final.values()), exclude_ids=all_ids)
+
+        # 3. החלת השינויים וקומיט אחד
+        for shift_id, values in final.items():
+            old_branch_id = targets[shift_id].branch_id
+            for field, value in values.items():
+                setattr(targets[shift_id], field, value)
+            _log_update(db, targets[shift_id], old_branch_id)
+        for shift_id in deletes:
+            db.delete(targets[shift_id])
+            log_shift_change(db, targets[shift_id], "delete")
+
+        db.flush()
+        updated = [ShiftOut.model_validate(targets[shift_id]) for shift_id in final]
+        db.commit()
+
+    return {"updated": updated, "deleted": sorted(deletes)}
+
+
+def create_shifts_bulk(db: Session, shifts_in: List[ShiftCreate]):
+    """
+    Insert many shifts of one branch in one transaction (e.g. a generated schedule).
+    All or nothing: any overlap (with existing shifts or inside the list) rejects the whole list.
+    """
+    if not shifts_in:
+        return []
+    branch_ids = {s.branch_id for s in shifts_in}
+    if len(branch_ids) != 1:
+        raise HTTPException(status_code=400, detail="All shifts must belong to the same branch")
+    branch_id = branch_ids.pop()
+    _route_for_write(db, branch_id)
+
+    with shift_write_guard(db, *{s.user_id for s in shifts_in}):
+        _check_overlaps_set_based(db, [s.model_dump() for s in shifts_in])
+
+        next_id = _next_shift_id(db, branch_id)
+        db_shifts = []
+        for i, shift_in in enumerate(shifts_in):
+            db_shift = Shift(id=next_id + i, **shift_in.model_dump())
+            db.add(db_shift)
+            log_shift_change(db, db_shift, "insert")
+            db_shifts.append(db_shift)
+
+        db.flush()
+        created = [ShiftOut.model_validate(s) for s in db_shifts]
+        db.commit()
+    return created
+
+
+def get_chain_hours_by_position(db: Session, branch_ids: List[int], start_date: date):
+    """
+    Hours per position for a week, for several branches at once: {branch_id: {position: hours}}
+    In sharded mode every branch lives in its own database, so the branches are queried in parallel.
+    """
+    if sharding_enabled():
+        hours = fan_out(branch_ids, lambda shard_db, branch_id: get_hours_by_position_weekly(
+            shard_db, branch_id=branch_id, start_date=start_date
+        ))
+        # branches without a shard have no hours yet
+        return {branch_id: hours.get(branch_id, {}) for branch_id in branch_ids}
+    return {
+        branch_id: get_hours_by_position_weekly(db, branch_id=branch_id, start_date=start_date)
+        for branch_id in branch_ids
+    }
+
+
+def get_available_candidates(db: Session, branch_id: int, start_time: datetime, end_time: datetime,
+                             position: Optional[str] = None):
+    """
+    Everyone in the branch who is free for [start_time, end_time): no overlapping shift and
+    allowed by their recorded availability. Ranked by hours already scheduled that week (least first).
+    One shifts query for the whole roster; roster and availability come from their caches.
+    """
+    has_shard = route_to_branch(db, branch_id)
+    staff = crud_user.get_branch_staff(db, branch_id=branch_id)
+    if not staff:
+        return []
+
+    # query params may come as "...Z", the DB values are naive
+    start_time, end_time = to_naive_utc(start_time), to_naive_utc(end_time)
+    week_start = datetime.combine(week_start_of(start_time.date()), datetime.min.time())
+    week_end = week_start + timedelta(days=7)
+    shifts = db.query(Shift.user_id, Shift.start_time, Shift.end_time, Shift.position).filter(
+        Shift.user_id.in_([u.id for u in staff]),
+        Shift.start_time < max(week_end, end_time),
+        Shift.end_time > min(week_start, start_time)
+    ).all() if has_shard else []
+
+    busy = set()
+    weekly_hours = {}
+    positions = {}
+    for user_id, s_start, s_end, s_position in shifts:
+        if s_start < end_time and s_end > start_time:
+            busy.add(user_id)
+        if s_start < week_end and s_end > week_start:
+            weekly_hours[user_id] = weekly_hours.get(user_id, 0) + (s_end - s_start).total_seconds() / 3600
+            positions.setdefault(user_id, set()).add(s_position)
+
+    free = [u for u in staff if u.id not in busy]
+    availability = crud_constraint.get_compiled_availability(db, [u.id for u in free])
+
+    candidates = [
+        {
+            "user_id": u.id,
+            "first_name": u.first_name,
+            "last_name": u.last_name,
+            "role": u.role,
+            "weekly_hours": round(weekly_hours.get(u.id, 0), 2),
+            "has_position_this_week": position is not None and position in positions.get(u.id, ()),
+        }
+        for u in free
+        if availability[u.id].is_allowed(start_time, end_time)
+    ]
+    # least loaded first; on a tie prefer people who already work this position
+    candidates.sort(key=lambda c: (c["weekly_hours"], not c["has_position_this_week"], c["first_name"], c["last_name"]))
+    return candidates
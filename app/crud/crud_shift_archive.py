@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.shift import Shift, ArchivedShift
+from app.db.sharding import sharding_enabled, route_to_branch, fan_out
+
+ARCHIVE_COLUMNS = ["id", "user_id", "branch_id", "start_time", "end_time", "position", "notes"]
+
+
+def archive_cutoff(now: Optional[datetime] = None) -> datetime:
+    now = now or datetime.now()
+    return now - timedelta(days=settings.SHIFT_ARCHIVE_AFTER_DAYS)
+
+
+def archive_branch_shifts(db: Session, branch_id: int, cutoff: datetime, batch_size: int = 500) -> int:
+    """
+    Move the branch's shifts that ended before `cutoff` to shifts_archive.
+    Works in small batches, each one its own short transaction, so writers are never blocked for long.
+    Returns the number of archived shifts.
+    """
+    if not route_to_branch(db, branch_id):
+        return 0
+    archived = 0
+
+    while True:
+        ids = [shift_id for (shift_id,) in db.query(Shift.id).filter(
+            Shift.branch_id == branch_id,
+            Shift.end_time < cutoff
+        ).order_by(Shift.id).limit(batch_size).all()]
+        if not ids:
+            return archived
+
+        # the end_time condition is repeated: a shift may have been moved forward since we picked it
+        batch_filter = [Shift.id.in_(ids), Shift.end_time < cutoff]
+        columns = [getattr(Shift, c) for c in ARCHIVE_COLUMNS]
+        db.execute(
+            insert(ArchivedShift).from_select(ARCHIVE_COLUMNS, select(*columns).where(*batch_filter))
+        )
+        archived += db.query(Shift).filter(*batch_filter).delete(synchronize_session=False)
+        db.commit()
+
+
+def archive_old_shifts(db: Session, branch_ids: list, cutoff: Optional[datetime] = None, batch_size: int = 500) -> dict:
+    """
+    Archive every branch, returns {branch_id: archived count}.
+    In sharded mode each branch has its own database, so they are archived in parallel.
+    """
+    cutoff = cutoff or archive_cutoff()
+    if sharding_enabled():
+        return fan_out(branch_ids, lambda shard_db, branch_id: archive_branch_shifts(
+            shard_db, branch_id=branch_id, cutoff=cutoff, batch_size=batch_size
+        ))
+    return {
+        branch_id: archive_branch_shifts(db, branch_id=branch_id, cutoff=cutoff, batch_size=batch_size)
+        for branch_id in branch_ids
+    }
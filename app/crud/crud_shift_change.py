@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.shift import Shift
+from app.db.models.shift_change import ShiftChange
+from app.db.sharding import sharding_enabled, route_to_branch, fan_out
+
+
+def log_shift_change(db: Session, shift: Shift, op: str, branch_id: Optional[int] = None):
+    """
+    Append to the change log in the caller's transaction (committed together with the shift write)
+    """
+    db.add(ShiftChange(
+        branch_id=branch_id if branch_id is not None else shift.branch_id,
+        shift_id=shift.id,
+        op=op,
+        changed_at=datetime.now()
+    ))
+
+
+def get_changes_since(db: Session, branch_id: int, since: int, limit: int = 1000):
+    """
+    Changes of a branch after sequence `since`, one entry per shift (its latest change).
+    resync_required=True when the log no longer covers `since` (compacted) - the client has to refetch.
+    """
+    if not route_to_branch(db, branch_id):
+        # no shard = nothing was ever written for this branch; same rule as below for since > last_seq
+        return {"branch_id": branch_id, "last_seq": 0, "resync_required": since > 0, "has_more": False, "changes": []}
+    oldest_seq, last_seq = db.query(func.min(ShiftChange.seq), func.max(ShiftChange.seq)).one()
+    last_seq = last_seq or 0
+
+    # everything before oldest_seq was compacted away; since > last_seq means the log was reset
+    if (oldest_seq is not None and since < oldest_seq - 1) or since > last_seq:
+        return {"branch_id": branch_id, "last_seq": last_seq, "resync_required": True, "has_more": False, "changes": []}
+
+    rows = db.query(ShiftChange).filter(
+        ShiftChange.branch_id == branch_id,
+        ShiftChange.seq > since
+    ).order_by(ShiftChange.seq).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest = {}
+    for row in rows:
+        latest[row.shift_id] = row
+
+    live_ids = [shift_id for shift_id, row in latest.items() if row.op != "delete"]
+    shifts = {}
+    if live_ids:
+        shifts = {s.id: s for s in db.query(Shift).filter(Shift.id.in_(live_ids), Shift.branch_id == branch_id).all()}
+
+    changes = []
+    for row in sorted(latest.values(), key=lambda r: r.seq):
+        shift = shifts.get(row.shift_id)
+        # deleted / archived / moved away after this entry: for the client it's gone
+        op = row.op if row.op == "delete" or shift is not None else "delete"
+        changes.append({"seq": row.seq, "op": op, "shift_id": row.shift_id, "shift": shift if op != "delete" else None})
+
+    return {
+        "branch_id": branch_id,
+        # nothing newer for this branch up to last_seq, so the client can continue from there
+        "last_seq": rows[-1].seq if has_more else last_seq,
+        "resync_required": False,
+        "has_more": has_more,
+        "changes": changes,
+    }
+
+
+def _compact_changes(db: Session, cutoff: datetime) -> int:
+    # the newest entry is always kept so min(seq) keeps telling where the log starts
+    newest = db.query(func.max(ShiftChange.seq)).scalar()
+    if newest is None:
+        return 0
+    deleted = db.query(ShiftChange).filter(
+        ShiftChange.changed_at < cutoff,
+        ShiftChange.seq < newest
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def compact_shift_changes(db: Session, branch_ids: list, cutoff: Optional[datetime] = None) -> int:
+    """
+    Drop change log entries older than SHIFT_CHANGE_RETENTION_DAYS, returns the number of deleted entries
+    """
+    cutoff = cutoff or datetime.now() - timedelta(days=settings.SHIFT_CHANGE_RETENTION_DAYS)
+    if sharding_enabled():
+        # every shard has its own log
+        return sum(fan_out(branch_ids, lambda shard_db, branch_id: _compact_changes(shard_db, cutoff)).values())
+    return _compact_changes(db, cutoff)
@@ -1,8 +1,12 @@
 from sqlalchemy.orm import Session
+from app.core.cache import branch_cache, roster_cache, staff_search_cache
+from app.core.search import StaffSearchIndex
 from app.db.models.user import User
-from app.schemas.user import UserCreate
+from app.schemas.user import UserCreate, UserOut, UserSearchResult
 from app.core.security import get_password_hash
 
+CHAIN_SEARCH_KEY = "chain"
+
 def create_user(db: Session, user_in: UserCreate):
     hashed_password = get_password_hash(user_in.password)
     db_user = User(
@@ -17,6 +21,13 @@ def create_user(db: Session, user_in: UserCreate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    if db_user.branch_id is not None:
+        # the roster and the BranchWithUsers view of this branch are now stale
+        roster_cache.invalidate(db_user.branch_id)
+        branch_cache.invalidate(db_user.branch_id)
+        staff_search_cache.invalidate(db_user.branch_id)
+    # the chain-wide index has its own key (invalidate(None) would clear every branch)
+    staff_search_cache.invalidate(CHAIN_SEARCH_KEY)
     return db_user
 
 def get_user_by_email(db: Session, email:str):
@@ -25,5 +36,25 @@ def get_user_by_email(db: Session, email:str):
 def get_user(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
+def get_branch_staff(db: Session, branch_id: int):
+    """
+    Read-through staff roster of a branch (cached as UserOut list)
+    """
+    def load():
+        users = db.query(User).filter(User.branch_id == branch_id).all()
+        return [UserOut.model_validate(u) for u in users]
+    return roster_cache.get_or_load(branch_id, load)
 
 
+def search_staff(db: Session, q: str, branch_id: int = None, limit: int = 10):
+    """
+    Prefix search by name / email for the employee picker. The index of the branch
+    (or of the whole chain when branch_id is None) is built once and cached.
+    """
+    def load():
+        query = db.query(User.id, User.first_name, User.last_name, User.email, User.role, User.branch_id)
+        if branch_id is not None:
+            query = query.filter(User.branch_id == branch_id)
+        return StaffSearchIndex(UserSearchResult.model_validate(u) for u in query.all())
+    key = branch_id if branch_id is not None else CHAIN_SEARCH_KEY
+    return staff_search_cache.get_or_load(key, load).search(q, limit=limit)
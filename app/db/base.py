@@ -1,5 +1,7 @@
 from app.db.session import Base
 from app.db.models.user import User
 from app.db.models.branch import Branch
-from app.db.models.shift import Shift
+from app.db.models.shift import Shift, ArchivedShift
+from app.db.models.shift_change import ShiftChange
+from app.db.models.constraint import Availability
 
@@ -0,0 +1,18 @@
+"""
+Explicit schema step: creates the missing tables (the app no longer does it on import).
+
+    python -m app.db.init_db
+
+Shard tables (SHARD_DATABASE_DIR) are still created when a branch shard is first opened.
+"""
+from app.db.base import Base
+from app.db.session import get_engine
+
+
+def init_db(engine=None):
+    Base.metadata.create_all(bind=engine or get_engine())
+
+
+if __name__ == "__main__":
+    init_db()
+    print("Database schema is up to date")
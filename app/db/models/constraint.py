@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Date, Time, ForeignKey
+from app.db.session import Base
+
+
+class Availability(Base):
+    """
+    When an employee can (kind="available") or can't (kind="unavailable") work.
+    Recurring every week (weekday set) or a one-off date (date set).
+    No start/end time = the whole day.
+    """
+    __tablename__ = "availability"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    kind = Column(String, nullable=False)
+    weekday = Column(Integer, nullable=True)  # 0=Monday .. 6=Sunday
+    date = Column(Date, nullable=True)
+    start_time = Column(Time, nullable=True)
+    end_time = Column(Time, nullable=True)
+    notes = Column(String, nullable=True)
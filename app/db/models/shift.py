@@ -14,4 +14,19 @@ class Shift(Base):
     position = Column(String, nullable=False)
     notes = Column(String, nullable=True)
     user = relationship("User", back_populates="shifts")
-    branch = relationship("Branch")
\ No newline at end of file
+    branch = relationship("Branch")
+
+class ArchivedShift(Base):
+    """
+    Cold tier: shifts older than SHIFT_ARCHIVE_AFTER_DAYS, moved here by crud_shift_archive.
+    Same columns (and ids) as Shift so both tiers serialize to ShiftOut.
+    """
+    __tablename__ = "shifts_archive"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    branch_id = Column(Integer, ForeignKey("branches.id"), nullable=False, index=True)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    position = Column(String, nullable=False)
+    notes = Column(String, nullable=True)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.db.session import Base
+
+
+class ShiftChange(Base):
+    """
+    Append-only log of shift writes, read by GET /shifts/changes for delta sync.
+    AUTOINCREMENT so seq never goes back, even after old entries are compacted away.
+    """
+    __tablename__ = "shift_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True)
+    branch_id = Column(Integer, nullable=False, index=True)
+    shift_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # insert / update / delete
+    changed_at = Column(DateTime, nullable=False)
@@ -1,19 +1,47 @@
+import threading
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.core.config import settings
 
 
+_engine = None
+_engine_lock = threading.Lock()
 
-SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
+#Bridge between python and sqlite - created on first use, so importing the app doesn't need the database
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    settings.DATABASE_URL, connect_args={"check_same_thread": False}
+                )
+    return _engine
 
-#Bridge between python and sqlite
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
 
-#sessionmaker instance to create database sessions
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def dispose_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+
+#Creates a database session (same call as the old sessionmaker instance: SessionLocal())
+def SessionLocal() -> Session:
+    return _session_factory(bind=get_engine())
+
+
+# backwards compatible `from app.db.session import engine`
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 #The class that all other models will inherit from (all Tables will be subclasses of this class)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
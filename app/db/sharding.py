@@ -0,0 +1,132 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.models.shift import Shift, ArchivedShift
+from app.db.models.shift_change import ShiftChange
+from app.db.session import get_engine
+
+# Every shard numbers its shifts from branch_id * SHARD_ID_SPAN, so shift ids stay unique
+# across the chain and the branch (= shard) of a shift can be read from its id.
+SHARD_ID_SPAN = 10 ** 9
+
+# tables that live in the branch shards, everything else stays in the catalog
+SHARDED_MODELS = (Shift, ArchivedShift, ShiftChange)
+
+_shard_engines = {}
+_shard_engines_lock = threading.Lock()
+
+
+def sharding_enabled() -> bool:
+    return bool(settings.SHARD_DATABASE_DIR)
+
+
+def _shard_path(branch_id: int) -> str:
+    return os.path.join(settings.SHARD_DATABASE_DIR, f"branch_{branch_id}.db")
+
+
+def shard_exists(branch_id: int) -> bool:
+    return branch_id in _shard_engines or os.path.exists(_shard_path(branch_id))
+
+
+class ShardNotFound(LookupError):
+    pass
+
+
+def get_shard_engine(branch_id: int, create: bool = False):
+    """
+    Engine of the branch's shift database. The file (with the shift tables) is only created with create=True,
+    which is reserved for the write path (see create_shard); reads of a branch without a shard raise ShardNotFound.
+    """
+    with _shard_engines_lock:
+        shard_engine = _shard_engines.get(branch_id)
+        if shard_engine is None:
+            if not create and not os.path.exists(_shard_path(branch_id)):
+                raise ShardNotFound(f"No shard for branch {branch_id}")
+            os.makedirs(settings.SHARD_DATABASE_DIR, exist_ok=True)
+            shard_engine = create_engine(f"sqlite:///{_shard_path(branch_id)}", connect_args={"check_same_thread": False})
+            for model in SHARDED_MODELS:
+                model.__table__.create(bind=shard_engine, checkfirst=True)
+            _shard_engines[branch_id] = shard_engine
+        return shard_engine
+
+
+def create_shard(branch_id: int):
+    # only call for a branch that exists in the catalog (crud_shift checks it before the first write)
+    return get_shard_engine(branch_id, create=True)
+
+
+def reset_shard_engines():
+    with _shard_engines_lock:
+        for shard_engine in _shard_engines.values():
+            shard_engine.dispose()
+        _shard_engines.clear()
+
+
+class RoutingSession(Session):
+    """
+    Session over the catalog database (users, branches) + the shard of one branch (shifts, archive, change log).
+    The branch is chosen with route_to_branch(); everything that isn't a Shift goes to the catalog.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if mapper is not None and inspect(mapper).class_ in SHARDED_MODELS:
+            branch_id = self.info.get("branch_id")
+            if branch_id is None:
+                raise RuntimeError("Shift query in sharded mode without a branch (call route_to_branch first)")
+            return get_shard_engine(branch_id)
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+_sharded_session_factory = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+
+def ShardedSessionLocal() -> RoutingSession:
+    # catalog engine is bound on first use, like SessionLocal()
+    return _sharded_session_factory(bind=get_engine())
+
+
+def route_to_branch(db: Session, branch_id: int) -> bool:
+    """
+    Pick the branch's shard for the session's shift queries (no-op for a regular, single database session).
+    Returns False when the branch has no shard yet: read paths return an empty result instead of querying.
+    """
+    if isinstance(db, RoutingSession):
+        db.info["branch_id"] = branch_id
+        return shard_exists(branch_id)
+    return True
+
+
+def branch_of_shift(shift_id: int) -> int:
+    return shift_id // SHARD_ID_SPAN
+
+
+def first_shift_id(branch_id: int) -> int:
+    return branch_id * SHARD_ID_SPAN + 1
+
+
+def fan_out(branch_ids: Iterable[int], fn: Callable[[Session, int], object],
+            session_factory: Callable[[], Session] = ShardedSessionLocal, max_workers: int = 8) -> Dict[int, object]:
+    """
+    Run fn(db, branch_id) for every branch in parallel, each with its own routed session.
+    Branches without a shard (no shift was ever written) are skipped.
+    Returns {branch_id: result}.
+    """
+    def run(branch_id: int):
+        db = session_factory()
+        try:
+            route_to_branch(db, branch_id)
+            return fn(db, branch_id)
+        finally:
+            db.close()
+
+    branch_ids = [branch_id for branch_id in branch_ids if shard_exists(branch_id)]
+    if not branch_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(branch_ids))) as pool:
+        return dict(zip(branch_ids, pool.map(run, branch_ids)))
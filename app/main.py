@@ -1,27 +1,55 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api import health
 from app.api.v1.api import api_router
-from app.db.base import Base
-from app.db.session import engine
+from app.core.config import settings
+from app.db.init_db import init_db
+from app.db.session import dispose_engine
+from app.db.sharding import reset_shard_engines
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # startup: the schema is an explicit step (python -m app.db.init_db), only created here when asked to
+    if settings.CREATE_SCHEMA_ON_STARTUP:
+        init_db()
+    app.state.ready = True
+    yield
+    # shutdown: close pooled connections of the catalog and of every opened branch shard
+    app.state.ready = False
+    reset_shard_engines()
+    dispose_engine()
+
+
+def create_app() -> FastAPI:
+    """
+    Application factory. Nothing here touches the database or reads settings,
+    so building (and importing) the app is cheap; connections are opened on first use.
+    """
+    app = FastAPI(title="Decathlon Shifter", lifespan=lifespan)
+    app.state.ready = False
 
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173", "http://localhost:3000"],  # Vite default port and common React port
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
-#Creates all tables when app in running for the first time
-Base.metadata.create_all(bind=engine)
+    app.include_router(api_router, prefix="/api/v1")
+    app.include_router(health.router, prefix="/health", tags=["health"])
 
-app = FastAPI(title="Decathlon Shifter")
+    @app.get("/")
+    async def read_root():
+        return {"message": "Welcome to Decathlon Shifter!"}
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:3000"],  # Vite default port and common React port
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    return app
 
-app.include_router(api_router, prefix="/api/v1")
 
-@app.get("/")
-async def read_root():
-    return {"message": "Welcome to Decathlon Shifter!"}
+# uvicorn app.main:app (or: uvicorn --factory app.main:create_app)
+app = create_app()
@@ -0,0 +1,92 @@
+import datetime as dt
+from datetime import date, datetime, time
+from typing import Optional, List, Literal
+from pydantic import BaseModel, Field, model_validator
+from app.schemas.shift import ShiftCreate
+
+
+# כמה עובדים צריך בכל עמדה ובכל משמרת (בוקר / אמצע / ערב)
+class StaffingRequirement(BaseModel):
+    position: str
+    bucket: Literal["morning", "afternoon", "evening"]
+    headcount: int = Field(ge=1)
+    weekdays: Optional[List[int]] = None  # 0=Monday .. 6=Sunday, None = every day
+
+
+# אילוצים של עובד ספציפי לשבוע הזה
+class EmployeeConstraint(BaseModel):
+    user_id: str
+    max_hours_per_week: Optional[float] = None
+    positions: Optional[List[str]] = None  # None = any position
+    unavailable_dates: List[date] = []
+
+
+class ScheduleRequest(BaseModel):
+    branch_id: int
+    week_start: date
+    requirements: List[StaffingRequirement]
+    constraints: List[EmployeeConstraint] = []
+    default_max_hours_per_week: float = 42
+
+
+class UnfilledSlot(BaseModel):
+    date: date
+    bucket: str
+    position: str
+
+
+class ScheduleProposal(BaseModel):
+    branch_id: int
+    week_start: date
+    shifts: List[ShiftCreate]
+    unfilled: List[UnfilledSlot]
+    filled_count: int
+    required_count: int
+
+
+class ScheduleCommit(BaseModel):
+    shifts: List[ShiftCreate]
+
+
+# זמינות / אי-זמינות של עובד: קבועה כל שבוע (weekday) או לתאריך מסוים (date)
+class AvailabilityCreate(BaseModel):
+    user_id: str
+    kind: Literal["available", "unavailable"]
+    weekday: Optional[int] = Field(default=None, ge=0, le=6)  # 0=Monday .. 6=Sunday
+    date: Optional[dt.date] = None  # (dt.date: the field name shadows the type here)
+    start_time: Optional[time] = None  # None = from the start of the day
+    end_time: Optional[time] = None    # None = until the end of the day
+    notes: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if (self.weekday is None) == (self.date is None):
+            raise ValueError("Exactly one of weekday / date must be set")
+        if self.start_time is not None and self.end_time is not None and self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+
+
+class AvailabilityOut(AvailabilityCreate):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class WeekAvailability(BaseModel):
+    user_id: str
+    week_start: date
+    resolution_minutes: int
+    bitmap: str  # hex, bit i = quarter i of the week (Monday 00:00 = bit 0)
+
+
+class AvailabilityCheckRequest(BaseModel):
+    branch_id: int
+    start_time: datetime
+    end_time: datetime
+
+
+class AvailabilityCheckResult(BaseModel):
+    allowed: List[str]  # user ids
+    blocked: List[str]
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
+from app.core.timeutils import to_naive_utc
 
 
 class ShiftBase(BaseModel):
@@ -12,6 +13,12 @@ class ShiftBase(BaseModel):
     notes: Optional[str] = None
 
 class ShiftCreate(ShiftBase):
+    # runs before check_times, so both times are naive when compared
+    @field_validator('start_time', 'end_time')
+    @classmethod
+    def naive_utc(cls, v: datetime):
+        return to_naive_utc(v)
+
     @field_validator('end_time')
     @classmethod
     def check_times(cls, v: datetime, info):
@@ -19,6 +26,19 @@ class ShiftCreate(ShiftBase):
             raise ValueError('end_time must be after start_time')
         return v
 
+class ShiftBatchUpdate(ShiftCreate):
+    id: int
+
+class ShiftBatchMove(BaseModel):
+    id: int
+    offset_minutes: int = Field(ge=-7 * 24 * 60, le=7 * 24 * 60)  # הזזה בזמן (יכול להיות שלילי), עד שבוע לכל כיוון
+    user_id: Optional[str] = None     # גרירה לשורה של עובד אחר
+
+class ShiftBatch(BaseModel):
+    updates: List[ShiftBatchUpdate] = []
+    moves: List[ShiftBatchMove] = []
+    deletes: List[int] = []
+
 class ShiftOut(ShiftBase):
     id: int
     class Config:
@@ -53,3 +73,32 @@ class WeeklyHoursReport(BaseModel):
     branch_id: int
     week_start: str
     hours_by_position: dict  # {position: hours}
+
+class ChainHoursReport(BaseModel):
+    week_start: str
+    branches: Dict[int, dict]  # {branch_id: {position: hours}}
+
+class ShiftBatchResult(BaseModel):
+    updated: List[ShiftOut]
+    deleted: List[int]
+
+class ShiftChangeOut(BaseModel):
+    seq: int
+    op: str                           # insert / update / delete
+    shift_id: int
+    shift: Optional[ShiftOut] = None  # None for delete
+
+class ShiftChangesReport(BaseModel):
+    branch_id: int
+    last_seq: int           # להמשך סנכרון: since=last_seq
+    resync_required: bool   # הלוג כבר לא מכסה את since - צריך לטעון הכל מחדש
+    has_more: bool
+    changes: List[ShiftChangeOut]
+
+class AvailableCandidate(BaseModel):
+    user_id: str
+    first_name: str
+    last_name: str
+    role: str
+    weekly_hours: float             # כבר משובץ השבוע (שני-ראשון)
+    has_position_this_week: bool    # כבר עובד השבוע בעמדה המבוקשת
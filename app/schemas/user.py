@@ -20,4 +20,17 @@ class UserOut(BaseModel):
     branch_id: Optional[int] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# Compact row for the employee picker (/users/search)
+class UserSearchResult(BaseModel):
+    id: str
+    first_name: str
+    last_name: str
+    email: str
+    role: str
+    branch_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
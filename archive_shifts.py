@@ -0,0 +1,31 @@
+from app.core.config import settings
+from app.crud import crud_branch
+from app.crud.crud_shift_archive import archive_old_shifts, archive_cutoff
+from app.crud.crud_shift_change import compact_shift_changes
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+
+# להרצה מתוזמנת (cron): מעביר משמרות ישנות מ-shifts ל-shifts_archive ומנקה את shift_changes
+def run_archive():
+    init_db()
+    db = SessionLocal()
+    try:
+        branch_ids = crud_branch.get_branch_ids(db)
+        cutoff = archive_cutoff()
+        print(f"Archiving shifts that ended before {cutoff:%Y-%m-%d} ({settings.SHIFT_ARCHIVE_AFTER_DAYS} days)")
+        result = archive_old_shifts(db, branch_ids=branch_ids, cutoff=cutoff)
+        for branch_id, count in result.items():
+            if count:
+                print(f"Branch {branch_id}: archived {count} shifts")
+        print(f"Archiving completed, {sum(result.values())} shifts archived")
+
+        compacted = compact_shift_changes(db, branch_ids=branch_ids)
+        print(f"Change log compacted, {compacted} entries older than {settings.SHIFT_CHANGE_RETENTION_DAYS} days removed")
+    except Exception as e:
+        db.rollback()
+        print(f"Error occurred: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    run_archive()
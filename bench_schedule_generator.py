@@ -0,0 +1,62 @@
+"""
+Benchmark for the weekly schedule generator (app.core.scheduler), no database needed.
+
+Builds a synthetic branch (default 200 employees, a few positions, part-timers, days off)
+and times generate_schedule(). The target is about one second for a 200-employee week.
+
+    python bench_schedule_generator.py --employees 200 --runs 5
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from app.core.scheduler import Employee, generate_schedule
+from app.schemas.constraint import StaffingRequirement
+
+POSITIONS = ["Cashier", "Sports Advisor", "Warehouse", "Workshop", "Customer Service"]
+
+
+def build_input(employees: int, seed: int):
+    rnd = random.Random(seed)
+    week_start = date(2030, 1, 6)
+
+    # headcount grows with the roster: a bit over 3 shifts a week per employee
+    per_bucket = max(1, employees // 30)
+    requirements = [
+        StaffingRequirement(position=p, bucket=b, headcount=per_bucket)
+        for p in POSITIONS
+        for b in ("morning", "afternoon", "evening")
+    ]
+
+    staff = []
+    for i in range(employees):
+        staff.append(Employee(
+            user_id=f"E{i}",
+            max_hours=rnd.choice([20, 30, 42]),
+            positions=set(rnd.sample(POSITIONS, rnd.randint(1, 3))),
+            unavailable_dates={week_start + timedelta(days=rnd.randrange(7)) for _ in range(rnd.randint(0, 2))},
+        ))
+    return week_start, requirements, staff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the weekly schedule generator")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = []
+    for run in range(args.runs):
+        week_start, requirements, staff = build_input(args.employees, seed=run)
+        started = time.perf_counter()
+        filled, unfilled = generate_schedule(week_start, requirements, staff)
+        timings.append(time.perf_counter() - started)
+
+    total = len(filled) + len(unfilled)
+    print(f"{args.employees} employees, {total} slots: filled {len(filled)}, unfilled {len(unfilled)}")
+    print(f"best {min(timings) * 1000:.1f} ms, worst {max(timings) * 1000:.1f} ms over {args.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
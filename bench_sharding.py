@@ -0,0 +1,107 @@
+"""
+Write throughput benchmark: one shared SQLite file vs. one shift database per branch.
+
+Each branch gets its own writer process (like one uvicorn worker per branch) that books non-overlapping
+shifts through crud_shift.create_shift. Processes, not threads: with threads the run measures the GIL,
+with processes it measures SQLite's per-file writer lock, which is what sharding removes.
+With a single file all writers queue on the same database lock; with SHARD_DATABASE_DIR set
+they only share the lock with writers of the same branch.
+Runs in a temp directory (--dir to put it on a real disk, where every commit pays for fsync),
+the real database is not touched.
+
+    python bench_sharding.py --branches 1 2 4 8 --writes 200
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.crud import crud_shift
+from app.db.base import Base, Branch, User
+from app.db.sharding import RoutingSession, reset_shard_engines
+from app.schemas.shift import ShiftCreate
+
+
+def _catalog_engine(workdir: str):
+    return create_engine(f"sqlite:///{os.path.join(workdir, 'catalog.db')}",
+                         connect_args={"check_same_thread": False, "timeout": 60})
+
+
+def writer(workdir: str, sharded: bool, branch_id: int, writes: int, barrier):
+    # runs in its own process: own engines, own striped locks, only the database files are shared
+    settings.SHARD_DATABASE_DIR = os.path.join(workdir, "shards") if sharded else None
+    catalog = _catalog_engine(workdir)
+    SessionLocal = sessionmaker(class_=RoutingSession if sharded else Session,
+                                autocommit=False, autoflush=False, bind=catalog)
+    start = datetime(2030, 1, 1, 8, 0)
+    barrier.wait()
+    for i in range(writes):
+        db = SessionLocal()
+        try:
+            crud_shift.create_shift(db, shift_in=ShiftCreate(
+                user_id=f"B{branch_id}",
+                branch_id=branch_id,
+                start_time=start + timedelta(days=i),
+                end_time=start + timedelta(days=i, hours=8),
+                position="Cashier",
+            ))
+        finally:
+            db.close()
+    reset_shard_engines()
+    catalog.dispose()
+
+
+def run(branches: int, writes: int, sharded: bool, base_dir: str = None) -> float:
+    workdir = tempfile.mkdtemp(dir=base_dir)
+    catalog = _catalog_engine(workdir)
+    Base.metadata.create_all(bind=catalog)
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=catalog)
+    db = SessionLocal()
+    for b in range(1, branches + 1):
+        db.add(Branch(id=b, name=f"Bench {b}"))
+        db.add(User(id=f"B{b}", email=f"b{b}@bench.local", hashed_password="x",
+                    first_name="B", last_name=str(b), role="employee", branch_id=b))
+    db.commit()
+    db.close()
+    catalog.dispose()
+
+    # the clock starts once every writer has imported the app and opened its engines
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(branches + 1)
+    processes = [ctx.Process(target=writer, args=(workdir, sharded, b, writes, barrier)) for b in range(1, branches + 1)]
+    for p in processes:
+        p.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for p in processes:
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    if any(p.exitcode != 0 for p in processes):
+        raise SystemExit("A writer process failed")
+    return branches * writes / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded vs single-file shift writes")
+    parser.add_argument("--branches", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--writes", type=int, default=200, help="writes per branch")
+    parser.add_argument("--dir", help="where to create the temp databases (default: system temp dir)")
+    args = parser.parse_args()
+
+    print(f"{'branches':>8} {'single file w/s':>16} {'sharded w/s':>12}")
+    for branches in args.branches:
+        single = run(branches, args.writes, sharded=False, base_dir=args.dir)
+        sharded = run(branches, args.writes, sharded=True, base_dir=args.dir)
+        print(f"{branches:>8} {single:>16.0f} {sharded:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -33,3 +33,17 @@ export const getBranchStaff = async (branchId) => {
   const response = await api.get(`/users/branch-staff/${branchId}`);
   return response.data;
 };
+
+/**
+ * Search staff by the beginning of a name or email (Hebrew or Latin)
+ * @param {string} query - What the user typed
+ * @param {number} [branchId] - Limit to one branch (omit for the whole chain)
+ * @param {number} [limit=10] - Max results
+ * @returns {Promise<Array>} Array of {id, first_name, last_name, email, role, branch_id}
+ */
+export const searchStaff = async (query, branchId, limit = 10) => {
+  const params = { q: query, limit };
+  if (branchId != null) params.branch_id = branchId;
+  const response = await api.get('/users/search', { params });
+  return response.data;
+};
@@ -21,6 +21,21 @@ export const getShiftsByBranch = async (branchId) => {
   return response.data;
 };
 
+/**
+ * Find employees who are free to cover a time window (e.g. someone called in sick)
+ * @param {number} branchId - The branch ID
+ * @param {string} startTime - ISO datetime
+ * @param {string} endTime - ISO datetime
+ * @param {string} [position] - Position of the open shift
+ * @returns {Promise<Array>} Candidates ranked by hours already scheduled this week
+ */
+export const getAvailableEmployees = async (branchId, startTime, endTime, position) => {
+  const response = await api.get(`/shifts/branch/${branchId}/available`, {
+    params: { start_time: startTime, end_time: endTime, position },
+  });
+  return response.data;
+};
+
 /**
  * Create a new shift
  * @param {Object} shiftData - Shift data (user_id, branch_id, start_time, end_time, position, notes)
@@ -51,6 +66,29 @@ export const deleteShift = async (shiftId) => {
   await api.delete(`/shifts/${shiftId}`);
 };
 
+/**
+ * Apply many shift changes at once (all or nothing)
+ * @param {Object} batch - { updates: [{id, ...shiftData}], moves: [{id, offset_minutes, user_id?}], deletes: [id] }
+ * @returns {Promise<Object>} { updated: Array of shift objects, deleted: Array of ids }
+ */
+export const batchUpdateShifts = async (batch) => {
+  const response = await api.patch('/shifts/batch', batch);
+  return response.data;
+};
+
+/**
+ * Get shift changes of a branch since a sequence number (delta sync)
+ * @param {number} branchId - The branch ID
+ * @param {number} since - last_seq from the previous call (0 for everything)
+ * @returns {Promise<Object>} { last_seq, resync_required, has_more, changes: [{seq, op, shift_id, shift}] }
+ */
+export const getShiftChanges = async (branchId, since = 0) => {
+  const response = await api.get('/shifts/changes', {
+    params: { branch_id: branchId, since },
+  });
+  return response.data;
+};
+
 /**
  * Get weekly board view for a branch
  * @param {number} branchId - The branch ID
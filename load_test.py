@@ -0,0 +1,296 @@
+"""
+Load test for the API with a realistic traffic mix.
+
+Virtual users (threads, one keep-alive connection each) replay a weighted mix of:
+    login        - POST /auth/login (bcrypt, the most expensive request we have)
+    board        - GET  /shifts/weekly-board/{branch_id} (store leader)
+    my_shifts    - GET  /shifts/my-shifts (employees polling)
+    write        - POST /shifts/ (single shift)
+    bulk_write   - PATCH /shifts/batch (move a few shifts at once)
+
+Only local targets are allowed: either --in-process (starts app.main:app with uvicorn as a child process
+on a free port and a throw-away SQLite file) or --url pointing at localhost / 127.0.0.1.
+Prints throughput, p50/p95/p99 latency and error rate per route; --json writes the same as JSON
+so runs of different versions can be compared.
+
+    python load_test.py --in-process --users 20 --duration 30 --json load.json
+    python load_test.py --url http://127.0.0.1:8000 --mix login=1,board=4,my_shifts=8,write=2,bulk_write=1
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode, urlparse
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+DEFAULT_MIX = "login=1,board=4,my_shifts=8,write=2,bulk_write=1"
+PASSWORD = "load-test-password"
+
+
+class Client:
+    def __init__(self, host: str, port: int, prefix: str):
+        self.host, self.port, self.prefix = host, port, prefix
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+
+    def request(self, method: str, path: str, body=None, token=None, form=False):
+        headers = {}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if body is not None:
+            if form:
+                body = urlencode(body)
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+            else:
+                body = json.dumps(body)
+                headers["Content-Type"] = "application/json"
+        try:
+            self.conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            # broken keep-alive connection: reconnect for the next request and report the failure
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            raise
+        return response.status, json.loads(data) if data else None
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def record(self, route: str, seconds: float, outcome: str):
+        with self.lock:
+            r = self.routes.setdefault(route, {"latencies": [], "ok": 0, "conflict": 0, "error": 0})
+            r["latencies"].append(seconds)
+            r[outcome] += 1
+
+    def report(self, elapsed: float) -> dict:
+        def percentile(values, p):
+            return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] * 1000
+
+        routes = {}
+        total = errors = 0
+        for route, r in sorted(self.routes.items()):
+            latencies = sorted(r["latencies"])
+            count = len(latencies)
+            total += count
+            errors += r["error"]
+            routes[route] = {
+                "requests": count,
+                "rps": round(count / elapsed, 2),
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "conflicts": r["conflict"],
+                "errors": r["error"],
+                "error_rate": round(r["error"] / count, 4),
+            }
+        return {
+            "duration_s": round(elapsed, 2),
+            "requests": total,
+            "rps": round(total / elapsed, 2),
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "routes": routes,
+        }
+
+
+def timed(stats: Stats, route: str, fn, expected=(200,), conflict=(400, 409)):
+    started = time.perf_counter()
+    try:
+        status, data = fn()
+    except Exception:
+        stats.record(route, time.perf_counter() - started, "error")
+        return None
+    elapsed = time.perf_counter() - started
+    # overlapping shifts are rejected on purpose, that's load on the conflict path, not a failure
+    outcome = "ok" if status in expected else "conflict" if status in conflict else "error"
+    stats.record(route, elapsed, outcome)
+    return data if outcome == "ok" else None
+
+
+def setup(client: Client, employees: int, run_id: str) -> dict:
+    """
+    Create a branch, a store leader and employees through the API and log everyone in once
+    """
+    leader = {"id": f"lt-{run_id}-leader", "email": f"leader-{run_id}@loadtest.decathlon-shifter.com"}
+    status, _ = client.request("POST", "/users/", {
+        **leader, "password": PASSWORD, "first_name": "Load", "last_name": "Leader", "role": "Store Leader"
+    })
+    if status != 200:
+        raise SystemExit(f"Could not create the store leader (HTTP {status})")
+    _, token = client.request("POST", "/auth/login", {"username": leader["email"], "password": PASSWORD}, form=True)
+    leader_token = token["access_token"]
+
+    status, branch = client.request("POST", "/branches/", {"name": f"Load test {run_id}"}, token=leader_token)
+    if status != 200:
+        raise SystemExit(f"Could not create the branch (HTTP {status})")
+
+    staff = []
+    for i in range(employees):
+        user = {"id": f"lt-{run_id}-{i}", "email": f"e{i}-{run_id}@loadtest.decathlon-shifter.com"}
+        client.request("POST", "/users/", {
+            **user, "password": PASSWORD, "first_name": "Load", "last_name": f"Employee {i}",
+            "role": "Employee", "branch_id": branch["id"]
+        })
+        _, token = client.request("POST", "/auth/login", {"username": user["email"], "password": PASSWORD}, form=True)
+        staff.append({**user, "token": token["access_token"]})
+
+    return {"branch_id": branch["id"], "leader_token": leader_token, "staff": staff}
+
+
+def virtual_user(client: Client, ctx: dict, mix: list, deadline: float, seed: int, stats: Stats):
+    rnd = random.Random(seed)
+    actions, weights = zip(*mix)
+    week_start = date.today() + timedelta(days=28 - date.today().weekday())
+    my_shift_ids = []
+
+    while time.time() < deadline:
+        action = rnd.choices(actions, weights)[0]
+        employee = rnd.choice(ctx["staff"])
+
+        if action == "login":
+            timed(stats, "POST /auth/login", lambda: client.request(
+                "POST", "/auth/login", {"username": employee["email"], "password": PASSWORD}, form=True))
+
+        elif action == "board":
+            timed(stats, "GET /shifts/weekly-board/{branch_id}", lambda: client.request(
+                "GET", f"/shifts/weekly-board/{ctx['branch_id']}?start_date={week_start}", token=ctx["leader_token"]))
+
+        elif action == "my_shifts":
+            timed(stats, "GET /shifts/my-shifts", lambda: client.request(
+                "GET", "/shifts/my-shifts", token=employee["token"]))
+
+        elif action == "write":
+            start = datetime.combine(week_start + timedelta(days=rnd.randrange(7)), datetime.min.time()) \
+                + timedelta(hours=rnd.choice([8, 11, 15]))
+            created = timed(stats, "POST /shifts/", lambda: client.request("POST", "/shifts/", {
+                "user_id": employee["id"], "branch_id": ctx["branch_id"],
+                "start_time": start.isoformat(), "end_time": (start + timedelta(hours=4)).isoformat(),
+                "position": rnd.choice(["Cashier", "Sports Advisor", "Warehouse"]),
+            }, token=ctx["leader_token"]))
+            if created:
+                my_shift_ids.append(created["id"])
+
+        elif action == "bulk_write":
+            if not my_shift_ids:
+                continue
+            ids = rnd.sample(my_shift_ids, min(5, len(my_shift_ids)))
+            offset = rnd.choice([-60, -30, 30, 60])
+            timed(stats, "PATCH /shifts/batch", lambda: client.request("PATCH", "/shifts/batch", {
+                "moves": [{"id": i, "offset_minutes": offset} for i in ids]
+            }, token=ctx["leader_token"]), conflict=(400, 404, 409))
+
+
+def parse_mix(value: str) -> list:
+    mix = []
+    for part in value.split(","):
+        name, weight = part.split("=")
+        if name not in ("login", "board", "my_shifts", "write", "bulk_write"):
+            raise SystemExit(f"Unknown action in --mix: {name}")
+        mix.append((name, float(weight)))
+    return mix
+
+
+def start_in_process_server():
+    """
+    Run app.main:app with uvicorn in a subprocess (own interpreter, so the load generator's
+    threads don't share its GIL) against a temp database
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    workdir = tempfile.mkdtemp()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'load_test.db')}",
+               CREATE_SCHEMA_ON_STARTUP="true")
+    env.pop("SHARD_DATABASE_DIR", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return server, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise SystemExit("uvicorn did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local load test with a realistic traffic mix")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--in-process", action="store_true", help="start app.main:app locally on a temp database")
+    target.add_argument("--url", help="running local server, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20, help="virtual users (threads)")
+    parser.add_argument("--employees", type=int, default=20, help="employees created for the run")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"action weights (default {DEFAULT_MIX})")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.employees < 1 or args.users < 1:
+        raise SystemExit("--users and --employees must be at least 1")
+    server = None
+    url = args.url
+    if args.in_process:
+        server, url = start_in_process_server()
+
+    parsed = urlparse(url)
+    if parsed.hostname not in LOCAL_HOSTS:
+        raise SystemExit("Only local servers can be load tested (localhost / 127.0.0.1)")
+    port = parsed.port or 80
+    prefix = "/api/v1"
+
+    try:
+        run_id = uuid.uuid4().hex[:8]
+        ctx = setup(Client(parsed.hostname, port, prefix), args.employees, run_id)
+
+        stats = Stats()
+        deadline = time.time() + args.duration
+        threads = [
+            threading.Thread(target=virtual_user, args=(
+                Client(parsed.hostname, port, prefix), ctx, mix, deadline, i, stats
+            ))
+            for i in range(args.users)
+        ]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        report = stats.report(time.perf_counter() - started)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report["config"] = {"target": "in-process" if args.in_process else url, "users": args.users,
+                        "employees": args.employees, "mix": dict(mix)}
+
+    print(f"{'route':<40} {'req':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'conf':>6} {'err%':>6}")
+    for route, r in report["routes"].items():
+        print(f"{route:<40} {r['requests']:>7} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+              f"{r['p99_ms']:>8.1f} {r['conflicts']:>6} {r['error_rate'] * 100:>5.1f}%")
+    print(f"Total: {report['requests']} requests, {report['rps']:.1f} req/s, error rate {report['error_rate'] * 100:.2f}%")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+One-off move of the shifts from the single database into the per-branch shards.
+
+Turning on SHARD_DATABASE_DIR does not move anything: shifts that are still in the catalog database
+(ids below 10^9) can't be routed and would return 404. Stop the API, set SHARD_DATABASE_DIR and run
+
+    python migrate_to_shards.py
+
+Shift ids change to branch_id * 10^9 + old id. Delta-sync clients get resync_required and reload.
+Safe to run again after an interruption.
+"""
+from app.core.config import settings
+from app.crud import crud_branch
+from app.crud.crud_shard_migration import migrate_to_shards
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.db.sharding import sharding_enabled, ShardedSessionLocal
+
+
+def run_migration():
+    if not sharding_enabled():
+        raise SystemExit("SHARD_DATABASE_DIR is not set, nothing to migrate to")
+    init_db()
+    db = SessionLocal()
+    try:
+        branch_ids = crud_branch.get_branch_ids(db)
+    finally:
+        db.close()
+
+    print(f"Moving shifts of {len(branch_ids)} branches into {settings.SHARD_DATABASE_DIR}")
+    result = migrate_to_shards(SessionLocal, ShardedSessionLocal, branch_ids)
+    for branch_id, moved in result.items():
+        if moved["shifts"] or moved["archived"]:
+            print(f"Branch {branch_id}: {moved['shifts']} shifts, {moved['archived']} archived shifts")
+    print(f"Migration completed, {sum(m['shifts'] + m['archived'] for m in result.values())} shifts moved")
+
+
+if __name__ == "__main__":
+    run_migration()
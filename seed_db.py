@@ -1,5 +1,6 @@
 from app.db.session import SessionLocal
 from app.db.base import Branch
+from app.db.init_db import init_db
 
 def seed_branches():
     db = SessionLocal()
@@ -20,6 +21,7 @@ def seed_branches():
         db.close()
 
 if __name__ == "__main__":
+    init_db()
     seed_branches()
 
 
@@ -0,0 +1,127 @@
+"""
+Concurrency stress test for shift writes.
+
+Many threads try to book overlapping shifts for a small set of employees at the same time.
+Afterwards we verify that no employee ended up double booked and print the write throughput.
+Runs against a throw-away SQLite file, the real database is not touched.
+
+    python stress_shift_writes.py --threads 16 --employees 20 --attempts 50
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import crud_shift
+from app.db.base import Base, Branch, Shift, User
+from app.schemas.shift import ShiftCreate
+
+
+def setup_database(path: str, employees: int):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = SessionLocal()
+    db.add(Branch(id=1, name="Stress"))
+    for i in range(employees):
+        db.add(User(id=f"E{i}", email=f"e{i}@stress.local", hashed_password="x",
+                    first_name="E", last_name=str(i), role="employee", branch_id=1))
+    db.commit()
+    db.close()
+    return engine, SessionLocal
+
+
+def worker(SessionLocal, employees: int, attempts: int, seed: int, results: dict, lock: threading.Lock):
+    rnd = random.Random(seed)
+    base = datetime(2030, 1, 7, 8, 0)
+    created = conflicts = errors = 0
+
+    for _ in range(attempts):
+        # a narrow window (one day, hourly starts) so threads collide on purpose
+        start = base + timedelta(hours=rnd.randint(0, 10))
+        shift_in = ShiftCreate(
+            user_id=f"E{rnd.randrange(employees)}",
+            branch_id=1,
+            start_time=start,
+            end_time=start + timedelta(hours=rnd.randint(2, 6)),
+            position="Cashier",
+        )
+        db = SessionLocal()
+        try:
+            crud_shift.create_shift(db, shift_in=shift_in)
+            created += 1
+        except HTTPException:
+            conflicts += 1
+        except Exception as e:
+            errors += 1
+            print(f"Error: {e}")
+        finally:
+            db.close()
+
+    with lock:
+        results["created"] += created
+        results["conflicts"] += conflicts
+        results["errors"] += errors
+
+
+def count_double_bookings(SessionLocal) -> int:
+    db = SessionLocal()
+    try:
+        shifts = db.query(Shift).order_by(Shift.user_id, Shift.start_time).all()
+    finally:
+        db.close()
+
+    double_bookings = 0
+    for prev, cur in zip(shifts, shifts[1:]):
+        if prev.user_id == cur.user_id and cur.start_time < prev.end_time:
+            double_bookings += 1
+    return double_bookings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test concurrent shift writes")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=50, help="writes per thread")
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine, SessionLocal = setup_database(path, args.employees)
+
+    results = {"created": 0, "conflicts": 0, "errors": 0}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(SessionLocal, args.employees, args.attempts, i, results, lock))
+        for i in range(args.threads)
+    ]
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    double_bookings = count_double_bookings(SessionLocal)
+    engine.dispose()
+    os.remove(path)
+
+    total = args.threads * args.attempts
+    print(f"Writes attempted: {total} in {elapsed:.2f}s ({total / elapsed:.0f} writes/s)")
+    print(f"Created: {results['created']}, rejected as conflict: {results['conflicts']}, errors: {results['errors']}")
+    print(f"Double bookings: {double_bookings}")
+    if double_bookings or results["errors"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()